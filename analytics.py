@@ -0,0 +1,203 @@
+import sys
+from array import array
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from model import DeliveryMethod, OrderStatus
+from money import Money
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only the aggregation engine needs it
+    np = None
+
+# Code tables of the categorical columns; a code is the index in its table
+STATUS_CODES = tuple(OrderStatus)
+CUSTOMER_KIND_CODES = ('private', 'corporate')
+DELIVERY_METHOD_CODES = tuple(DeliveryMethod)
+
+# Value -> code lookups used by the export
+_STATUS_LOOKUP = {status: code for code, status in enumerate(STATUS_CODES)}
+_CUSTOMER_KIND_LOOKUP = {kind: code for code, kind in enumerate(CUSTOMER_KIND_CODES)}
+_DELIVERY_METHOD_LOOKUP = {method: code for code, method in enumerate(DELIVERY_METHOD_CODES)}
+
+# Amount columns, stored as integer cents
+AMOUNT_COLUMNS = ('subtotal_cents', 'discount_cents', 'delivery_fee_cents', 'sales_amount_cents')
+
+# Columns that can be grouped by, with the code table used to decode them (None for dates)
+GROUP_COLUMNS = {
+    'day': ('date_ordinal', None),
+    'status': ('status_code', STATUS_CODES),
+    'customer_kind': ('customer_kind_code', CUSTOMER_KIND_CODES),
+    'delivery_method': ('delivery_method_code', DELIVERY_METHOD_CODES),
+}
+
+def cents_to_decimal(cents: int) -> Decimal:
+    """Convert integer cents back to a two-decimal amount"""
+    return Money(int(cents)).to_decimal()
+
+
+class OrderColumns:
+    '''Columnar export of orders: one typed array per attribute, with
+    amounts in integer cents, dates as ordinals and categories as codes'''
+    def __init__(self):
+        """Initialize empty columns"""
+        self.order_numbers: List[str] = []
+        self.columns: Dict[str, array] = {
+            'date_ordinal': array('l'),
+            'status_code': array('b'),
+            'customer_kind_code': array('b'),
+            'delivery_method_code': array('b'),
+        }
+        for column in AMOUNT_COLUMNS:
+            self.columns[column] = array('q')
+
+    def __len__(self) -> int:
+        return len(self.order_numbers)
+
+    def append(self, order: 'Order'):
+        """Add one order as a row of the columns"""
+        self.order_numbers.append(order.order_number)
+        columns = self.columns
+        columns['date_ordinal'].append(order.order_date.toordinal())
+        columns['status_code'].append(_STATUS_LOOKUP[order.order_status])
+        columns['customer_kind_code'].append(_CUSTOMER_KIND_LOOKUP[order.customer_kind])
+        columns['delivery_method_code'].append(_DELIVERY_METHOD_LOOKUP[order.delivery_method])
+        columns['subtotal_cents'].append(order.subtotal_cents)
+        columns['discount_cents'].append(order.discount_cents)
+        columns['delivery_fee_cents'].append(order.delivery_fee_cents)
+        columns['sales_amount_cents'].append(order.sales_amount_cents)
+
+    def to_numpy(self) -> Dict[str, 'np.ndarray']:
+        """Return the columns as NumPy arrays (no copy of the underlying buffers)"""
+        _require_numpy()
+        return {name: np.frombuffer(column, dtype=column.typecode)
+                if len(column) else np.array([], dtype=column.typecode)
+                for name, column in self.columns.items()}
+
+    def save(self, filename: str):
+        """Write the columns to a NumPy .npz file"""
+        _require_numpy()
+        np.savez(filename, order_numbers=np.array(self.order_numbers), **self.to_numpy())
+
+
+def export_columns(orders: Iterable['Order']) -> OrderColumns:
+    """Export an iterable of orders to columnar form
+
+    Args:
+        orders (Iterable[Order]): Orders to export, e.g. repository.orders_between(...)
+
+    Returns:
+        OrderColumns: The exported columns
+    """
+    columns = OrderColumns()
+    for order in orders:
+        columns.append(order)
+    return columns
+
+def _require_numpy():
+    """Raise a clear error when the optional NumPy dependency is missing"""
+    if np is None:
+        raise ImportError("The analytics engine requires NumPy: pip install numpy")
+
+
+def group_totals(columns: OrderColumns, by: Tuple[str, ...] = ('day',),
+                 start_date: Optional[date] = None,
+                 end_date: Optional[date] = None) -> Dict[tuple, Dict[str, int]]:
+    """Sum order counts and amounts per group with NumPy
+
+    Rows are sorted by their combined group code once, then every amount
+    column is summed per group with np.add.reduceat on int64 cents, so the
+    totals are exact.
+
+    Args:
+        columns (OrderColumns): Exported orders
+        by (Tuple[str, ...]): Group keys out of 'day', 'status', 'customer_kind', 'delivery_method'
+        start_date (date): First day to include, None for no lower bound
+        end_date (date): Last day to include, None for no upper bound
+
+    Returns:
+        Dict[tuple, Dict[str, int]]: For each group key (decoded values in the order of by),
+            'order_count' and the amount columns in cents
+    """
+    _require_numpy()
+    data = columns.to_numpy()
+
+    # Date window
+    mask = np.ones(len(columns), dtype=bool)
+    if start_date is not None:
+        mask &= data['date_ordinal'] >= start_date.toordinal()
+    if end_date is not None:
+        mask &= data['date_ordinal'] <= end_date.toordinal()
+    if not mask.any():
+        return {}
+
+    # Combine the key columns into one group code per row
+    keys = [data[GROUP_COLUMNS[name][0]][mask].astype(np.int64) for name in by]
+    group_codes = np.zeros(int(mask.sum()), dtype=np.int64)
+    for key in keys:
+        offset = key - key.min()
+        group_codes = group_codes * (int(offset.max()) + 1) + offset
+
+    order = np.argsort(group_codes, kind='stable')
+    sorted_codes = group_codes[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_codes)) + 1))
+    counts = np.diff(np.append(starts, len(sorted_codes)))
+    sums = {column: np.add.reduceat(data[column][mask][order].astype(np.int64), starts)
+            for column in AMOUNT_COLUMNS}
+
+    results = {}
+    for group, row in enumerate(order[starts]):
+        group_key = tuple(_decode(name, key[row]) for name, key in zip(by, keys))
+        totals = {'order_count': int(counts[group])}
+        for column in AMOUNT_COLUMNS:
+            totals[column] = int(sums[column][group])
+        results[group_key] = totals
+    return results
+
+def _decode(name: str, code: int):
+    """Turn a column code back into its value (a date, status, kind or delivery method)"""
+    column, codes = GROUP_COLUMNS[name]
+    if codes is None:
+        return date.fromordinal(int(code))
+    value = codes[int(code)]
+    return value.value if hasattr(value, 'value') else value
+
+def total_sales(columns: OrderColumns, start_date: Optional[date] = None,
+                end_date: Optional[date] = None) -> Decimal:
+    """Return the total sales amount of a date window, matching show_sales_report's header"""
+    _require_numpy()
+    groups = group_totals(columns, by=('customer_kind',), start_date=start_date, end_date=end_date)
+    return cents_to_decimal(sum(totals['sales_amount_cents'] for totals in groups.values()))
+
+def report_lines(columns: OrderColumns, by: Tuple[str, ...]) -> List[str]:
+    """Format the group totals of columns, one line per group, followed by the total sales"""
+    lines = []
+    for key, totals in sorted(group_totals(columns, by).items()):
+        lines.append(", ".join(str(value) for value in key) + f": {totals['order_count']} orders, "
+                     f"sales ${cents_to_decimal(totals['sales_amount_cents']):.2f}")
+    lines.append(f"Total Sales: ${total_sales(columns):.2f}")
+    return lines
+
+
+def analytics_job(store, start_date: Optional[date], end_date: Optional[date], by: str) -> int:
+    """Print the group totals of the orders of a date window
+
+    Args:
+        store (PickleStore or SQLiteStore): The opened store
+        start_date (date): First day, None for no lower bound
+        end_date (date): Last day, None for no upper bound
+        by (str): Comma separated group keys
+
+    Returns:
+        int: Process exit code, 1 for unknown group keys
+    """
+    keys = tuple(name.strip() for name in by.split(',') if name.strip())
+    unknown = [name for name in keys if name not in GROUP_COLUMNS]
+    if unknown:
+        print(f"Unknown group keys: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    exported = export_columns(store.orders.orders_between(start_date, end_date))
+    print("\n".join(report_lines(exported, keys)))
+    return 0
@@ -0,0 +1,562 @@
+import bisect
+import hashlib
+import os
+import pickle
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from money import Money
+from repository import file_signature
+
+# Default locations of the veggie catalog and the premade box configuration
+VEGGIES_FILE = 'static/veggies.txt'
+PREMADE_BOXES_FILE = 'static/premadeboxes.txt'
+
+# Compiled form of both files, reused while their contents are unchanged
+CATALOG_CACHE_FILE = 'data/catalog_cache.pkl'
+
+# Format version of the catalog cache, bumped when the cached rows change
+CATALOG_CACHE_VERSION = 1
+
+# Sale type words accepted after "by" in box contents, e.g. "Spinach by weight"
+SALE_TYPE_ALIASES = {
+    'weight/kg': 'weight',
+    'weight': 'weight',
+    'kg': 'weight',
+    'unit': 'unit',
+    'pack': 'pack',
+}
+
+# Premade box sizes, smallest first
+BOX_SIZES = ('small', 'medium', 'large')
+
+# Section headers of veggies.txt -> sale type used by the cart and the order items
+SECTION_SALE_TYPES = {
+    'weight/kg': 'weight',
+    'unit': 'unit',
+    'pack': 'pack',
+}
+
+
+class CatalogItem:
+    '''One product of the catalog, priced in integer cents'''
+    __slots__ = ('item_id', 'name', 'sale_type', 'price_cents')
+
+    def __init__(self, item_id: str, name: str, sale_type: str, price_cents: int):
+        """Initialize a catalog item
+
+        Args:
+            item_id (str): Stable identifier, e.g. 'spinach-weight'
+            name (str): Display name, e.g. 'Spinach by weight/kg'
+            sale_type (str): 'weight', 'unit' or 'pack'
+            price_cents (int): Price per kilo, unit or pack in cents
+        """
+        self.item_id = item_id
+        self.name = name
+        self.sale_type = sale_type
+        self.price_cents = price_cents
+
+    @property
+    def price(self) -> Money:
+        """Price as a Money amount"""
+        return Money(self.price_cents)
+
+    @property
+    def label(self) -> str:
+        """Display text used by the product comboboxes"""
+        return f"{self.name} - ${self.price:.2f}"
+
+    def __repr__(self) -> str:
+        return f"CatalogItem({self.item_id!r}, {self.name!r}, {self.sale_type!r}, {self.price_cents})"
+
+
+class Catalog:
+    '''The veggie catalog with constant-time lookups by id and by name'''
+    def __init__(self, items: List[CatalogItem] = None):
+        """Initialize the catalog and its lookup tables
+
+        Args:
+            items (List[CatalogItem]): Items in file order
+
+        Raises:
+            ValueError: If two items share an id or a name
+        """
+        self.items: List[CatalogItem] = []
+        self.positions: Dict[str, int] = {}  # id -> index in items
+        self.by_id: Dict[str, CatalogItem] = {}
+        self.by_name: Dict[str, CatalogItem] = {}
+        self.by_sale_type: Dict[str, List[CatalogItem]] = {sale_type: [] for sale_type in SECTION_SALE_TYPES.values()}
+        # Sale type (None for all) -> sorted search keys, built on the first search
+        self.search_indexes: Dict[Optional[str], Tuple[List[str], List[int], List[str], List[int]]] = {}
+        for item in items or []:
+            self.add(item)
+
+    def add(self, item: CatalogItem):
+        """Add an item to the catalog"""
+        if item.item_id in self.by_id:
+            raise ValueError(f"Duplicate catalog id: {item.item_id}")
+        if item.name in self.by_name:
+            raise ValueError(f"Duplicate catalog product: {item.name}")
+        self.positions[item.item_id] = len(self.items)
+        self.items.append(item)
+        self.by_id[item.item_id] = item
+        self.by_name[item.name] = item
+        self.by_sale_type.setdefault(item.sale_type, []).append(item)
+        self.search_indexes = {}
+
+    def get(self, item_id: str) -> Optional[CatalogItem]:
+        """Return the item with an id, or None"""
+        return self.by_id.get(item_id)
+
+    def find(self, name: str) -> Optional[CatalogItem]:
+        """Return the item with an exact display name, or None"""
+        return self.by_name.get(name)
+
+    def index(self, item_id: str) -> int:
+        """Return the position of an item in file order, -1 if it isn't in the catalog"""
+        return self.positions.get(item_id, -1)
+
+    def resolve(self, name: str) -> Optional[CatalogItem]:
+        """Look up a product written the way box configurations name it
+
+        Tries the exact display name, then '<veggie> by <sale type>' with
+        loose sale type words, e.g. 'Spinach by weight' -> 'spinach-weight'.
+        """
+        item = self.by_name.get(name)
+        if item is None and ' by ' in name:
+            base, sale_word = name.rsplit(' by ', 1)
+            sale_type = SALE_TYPE_ALIASES.get(sale_word.strip().lower())
+            if sale_type:
+                item = self.by_id.get(make_item_id(base, sale_type))
+        return item
+
+    def items_of_type(self, sale_type: str) -> List[CatalogItem]:
+        """Return the items sold by weight, unit or pack, in file order"""
+        return self.by_sale_type.get(sale_type, [])
+
+    def search(self, text: str, sale_type: Optional[str] = None, limit: int = 20) -> List[CatalogItem]:
+        """Type-ahead search: items whose name, or a later word of it, starts with text
+
+        Both lookups bisect a sorted key array, so a keystroke costs
+        O(log n + limit). Names starting with the text come first, then
+        names with a later word starting with it (e.g. 'pack').
+
+        Args:
+            text (str): Typed text, matched case-insensitively
+            sale_type (str): Only search 'weight', 'unit' or 'pack' items, None for all
+            limit (int): Maximum number of items to return
+
+        Returns:
+            List[CatalogItem]: Up to limit matching items
+        """
+        prefix = text.strip().lower()
+        if not prefix:
+            items = self.items if sale_type is None else self.items_of_type(sale_type)
+            return items[:limit]
+
+        name_keys, name_positions, word_keys, word_positions = self._search_index(sale_type)
+        results: List[CatalogItem] = []
+        seen = set()
+        for keys, positions in ((name_keys, name_positions), (word_keys, word_positions)):
+            index = bisect.bisect_left(keys, prefix)
+            while index < len(keys) and len(results) < limit and keys[index].startswith(prefix):
+                position = positions[index]
+                if position not in seen:
+                    seen.add(position)
+                    results.append(self.items[position])
+                index += 1
+        return results
+
+    def _search_index(self, sale_type: Optional[str]) -> Tuple[List[str], List[int], List[str], List[int]]:
+        """Return (name keys, positions, word keys, positions) sorted for bisect, building them once"""
+        index = self.search_indexes.get(sale_type)
+        if index is None:
+            names = []
+            words = []
+            for position, item in enumerate(self.items):
+                if sale_type is not None and item.sale_type != sale_type:
+                    continue
+                key = item.name.lower()
+                names.append((key, position))
+                # Every later word start, e.g. 'by unit' and 'unit' for 'carrot by unit'
+                start = key.find(' ')
+                while start >= 0:
+                    words.append((key[start + 1:], position))
+                    start = key.find(' ', start + 1)
+            names.sort()
+            words.sort()
+            index = ([key for key, _ in names], [position for _, position in names],
+                     [key for key, _ in words], [position for _, position in words])
+            self.search_indexes[sale_type] = index
+        return index
+
+    def to_rows(self) -> List[Tuple[str, str, str, int]]:
+        """Return the items as plain (id, name, sale type, price cents) tuples"""
+        return [(item.item_id, item.name, item.sale_type, item.price_cents) for item in self.items]
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple[str, str, str, int]]) -> 'Catalog':
+        """Rebuild a catalog from to_rows() output
+
+        The rows come from a catalog that was already checked for duplicates,
+        so the lookup tables are built in bulk instead of item by item.
+        """
+        catalog = cls()
+        catalog.items = [CatalogItem(*row) for row in rows]
+        catalog.positions = {item.item_id: index for index, item in enumerate(catalog.items)}
+        catalog.by_id = {item.item_id: item for item in catalog.items}
+        catalog.by_name = {item.name: item for item in catalog.items}
+        for item in catalog.items:
+            catalog.by_sale_type.setdefault(item.sale_type, []).append(item)
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def make_item_id(name: str, sale_type: str) -> str:
+    """Build the id of a product from its name, e.g. 'Spinach by weight/kg' -> 'spinach-weight'"""
+    base = name.split(' by ')[0].strip().lower()
+    return f"{'-'.join(base.split())}-{sale_type}"
+
+
+def parse_veggies(filename: str = VEGGIES_FILE) -> Catalog:
+    """Parse veggies.txt into a Catalog
+
+    Args:
+        filename (str): Path of the veggie catalog
+
+    Returns:
+        Catalog: The parsed catalog
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"{filename} file not found")
+
+    with open(filename, 'r') as f:
+        lines = f.readlines()
+
+    catalog = Catalog()
+    sale_type = None
+    for line in lines:
+        line = line.strip()
+        if not line:  # Skip empty lines
+            continue
+
+        if line.startswith('['):
+            sale_type = SECTION_SALE_TYPES.get(line[1:-1])  # Remove brackets
+        elif '=' in line and sale_type:
+            name, price = line.split('=')
+            name = name.strip()
+            catalog.add(CatalogItem(make_item_id(name, sale_type), name, sale_type,
+                                    Money.parse(price).cents))
+    return catalog
+
+
+def parse_premadeboxes(filename: str = PREMADE_BOXES_FILE) -> Dict[str, dict]:
+    """Parse premadeboxes.txt into one configuration per box size
+
+    Args:
+        filename (str): Path of the premade box configuration
+
+    Returns:
+        Dict[str, dict]: Box size -> {'price': Decimal, 'contents': List[str]}
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"{filename} file not found")
+
+    with open(filename, 'r') as f:
+        lines = f.readlines()
+
+    boxes = {size: {'price': Decimal('0'), 'contents': []} for size in BOX_SIZES}
+    current_size = None
+    for line in lines:
+        line = line.strip()
+        if not line:  # Skip empty lines
+            continue
+
+        if line.startswith('['):
+            current_size = line[1:-1].lower()
+            boxes.setdefault(current_size, {'price': Decimal('0'), 'contents': []})
+        elif '=' in line and current_size:
+            key, value = line.split('=')
+            key = key.lower()
+
+            if key == 'price':
+                # Save box price
+                boxes[current_size]['price'] = Decimal(value.strip()).quantize(
+                    Decimal('0.01'), rounding=ROUND_HALF_UP
+                )
+            elif key.startswith('item'):
+                # Save box contents
+                boxes[current_size]['contents'].append(value.strip())
+    return boxes
+
+
+def resolve_box_contents(boxes: Dict[str, dict], catalog: Catalog) -> Tuple[Dict[str, dict], List[str]]:
+    """Resolve the contents of every premade box to catalog ids
+
+    An entry that isn't an exact or '<veggie> by <sale type>' match falls
+    back to the one catalog product containing it (ignoring case), e.g. a
+    misspelt 'pinach by weight'; such guesses are reported along with the
+    entries that match nothing.
+
+    Args:
+        boxes (Dict[str, dict]): Parsed box configurations, left unchanged
+        catalog (Catalog): The catalog to resolve against
+
+    Returns:
+        Tuple[Dict[str, dict], List[str]]: Copies of the boxes with an 'item_ids' list
+            parallel to 'contents' (None for unresolved entries), and the report messages
+    """
+    resolved = {}
+    problems = []
+    for size, box_dict in boxes.items():
+        item_ids = []
+        for slot, entry in enumerate(box_dict['contents'], start=1):
+            item = catalog.resolve(entry)
+            if item is None:
+                needle = entry.lower()
+                candidates = [candidate for candidate in catalog if needle in candidate.name.lower()]
+                if len(candidates) == 1:
+                    item = candidates[0]
+                    problems.append(f"{size.capitalize()} box item {slot} '{entry}' matched '{item.name}'")
+                else:
+                    problems.append(f"{size.capitalize()} box item {slot} '{entry}' is not in the catalog")
+            item_ids.append(item.item_id if item else None)
+        resolved[size] = dict(box_dict, item_ids=item_ids)
+    return resolved, problems
+
+
+def file_hash(filename: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents"""
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class CatalogCache:
+    '''Pickled, already parsed catalog and box rows keyed by the hash of their
+    source file, so startup decodes one file instead of parsing the text'''
+    def __init__(self, filename: str = CATALOG_CACHE_FILE):
+        """Initialize the cache without reading the file
+
+        Args:
+            filename (str): Path of the cache file
+        """
+        self.filename = filename
+        self.entries: Optional[Dict[str, tuple]] = None
+        self.dirty = False
+
+    def _load(self) -> Dict[str, tuple]:
+        """Read the cache file once; a missing, stale or unreadable cache is empty"""
+        if self.entries is None:
+            self.entries = {}
+            try:
+                with open(self.filename, 'rb') as f:
+                    data = pickle.load(f)
+                if data.get('version') == CATALOG_CACHE_VERSION:
+                    self.entries = data['entries']
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Ignoring catalog cache: {str(e)}")
+        return self.entries
+
+    def get(self, key: str, source_hash: str):
+        """Return the cached value of a source file, or None if its hash changed
+
+        Args:
+            key (str): 'veggies' or 'boxes'
+            source_hash (str): Current hash of the source file
+        """
+        entry = self._load().get(key)
+        if entry is not None and entry[0] == source_hash:
+            return entry[1]
+        return None
+
+    def put(self, key: str, source_hash: str, value):
+        """Remember the compiled value of a source file until the next save()"""
+        self._load()[key] = (source_hash, value)
+        self.dirty = True
+
+    def save(self):
+        """Atomically write the cache if it changed; failures only skip the cache"""
+        if not self.dirty:
+            return
+        temp_filename = self.filename + '.tmp'
+        try:
+            with open(temp_filename, 'wb') as f:
+                pickle.dump({'version': CATALOG_CACHE_VERSION, 'entries': self.entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, self.filename)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error saving catalog cache: {str(e)}")
+
+
+class CatalogSnapshot(NamedTuple):
+    '''One published version of the catalog and the premade boxes, replaced as a whole'''
+    version: int
+    catalog: Catalog
+    boxes: Dict[str, dict]  # Box configurations with contents resolved to 'item_ids'
+    box_sources: Dict[str, dict]  # Boxes as written in the file
+    box_problems: List[str]  # Box contents that didn't resolve exactly
+    veggies_signature: Optional[Tuple[int, int]]
+    boxes_signature: Optional[Tuple[int, int]]
+
+
+class CatalogWatcher:
+    '''Keeps the catalog and the premade boxes in step with their text files.
+
+    check() only stats the two files; a file whose mtime or size changed is
+    reparsed on its own, the box contents are resolved against the catalog,
+    and a new CatalogSnapshot is published with a single assignment before
+    the listeners are told, so readers of the snapshot never see the
+    catalog of one version with the boxes of another.'''
+    def __init__(self, veggies_file: str = VEGGIES_FILE,
+                 boxes_file: str = PREMADE_BOXES_FILE,
+                 cache_file: Optional[str] = CATALOG_CACHE_FILE):
+        """Load the catalog and the premade boxes
+
+        Args:
+            veggies_file (str): Path of the veggie catalog
+            boxes_file (str): Path of the premade box configuration
+            cache_file (str): Path of the compiled catalog cache, None to always parse
+
+        Raises:
+            FileNotFoundError: If either file doesn't exist
+        """
+        self.veggies_file = veggies_file
+        self.boxes_file = boxes_file
+        self.cache = CatalogCache(cache_file) if cache_file else None
+        self.lock = threading.Lock()
+        self.listeners: List[Callable[[int], None]] = []
+
+        veggies_signature = file_signature(veggies_file)
+        boxes_signature = file_signature(boxes_file)
+        catalog = self._load_veggies()
+        box_sources = self._load_boxes()
+        self._save_cache()
+        boxes, problems = self._resolve_boxes(box_sources, catalog)
+        self.snapshot = CatalogSnapshot(1, catalog, boxes, box_sources, problems,
+                                        veggies_signature, boxes_signature)
+
+    @property
+    def version(self) -> int:
+        """Version number of the current snapshot"""
+        return self.snapshot.version
+
+    @property
+    def catalog(self) -> Catalog:
+        """Catalog of the current snapshot"""
+        return self.snapshot.catalog
+
+    @property
+    def boxes(self) -> Dict[str, dict]:
+        """Premade boxes of the current snapshot"""
+        return self.snapshot.boxes
+
+    @property
+    def box_problems(self) -> List[str]:
+        """Box contents of the current snapshot that didn't resolve exactly"""
+        return self.snapshot.box_problems
+
+    def _load_veggies(self) -> Catalog:
+        """Return the catalog from the cache, parsing veggies.txt only if it changed"""
+        if self.cache is None:
+            return parse_veggies(self.veggies_file)
+        source_hash = file_hash(self.veggies_file)
+        rows = self.cache.get('veggies', source_hash)
+        if rows is not None:
+            return Catalog.from_rows(rows)
+        catalog = parse_veggies(self.veggies_file)
+        self.cache.put('veggies', source_hash, catalog.to_rows())
+        return catalog
+
+    def _load_boxes(self) -> Dict[str, dict]:
+        """Return the premade boxes from the cache, parsing premadeboxes.txt only if it changed"""
+        if self.cache is None:
+            return parse_premadeboxes(self.boxes_file)
+        source_hash = file_hash(self.boxes_file)
+        boxes = self.cache.get('boxes', source_hash)
+        if boxes is not None:
+            return boxes
+        boxes = parse_premadeboxes(self.boxes_file)
+        self.cache.put('boxes', source_hash, boxes)
+        return boxes
+
+    @staticmethod
+    def _resolve_boxes(box_sources: Dict[str, dict], catalog: Catalog) -> Tuple[Dict[str, dict], List[str]]:
+        """Resolve the box contents to catalog ids and print what didn't resolve exactly"""
+        boxes, problems = resolve_box_contents(box_sources, catalog)
+        for problem in problems:
+            print(f"Premade box warning: {problem}")
+        return boxes, problems
+
+    def _save_cache(self):
+        """Write newly compiled entries to the cache file"""
+        if self.cache is not None:
+            self.cache.save()
+
+    def check(self) -> bool:
+        """Reload whichever source file changed since the last check
+
+        A file that fails to parse (e.g. while it is being saved) leaves the
+        current version in place and is retried on the next check.
+
+        Returns:
+            bool: True if a new catalog version was published
+        """
+        with self.lock:
+            current = self.snapshot
+            veggies_signature = file_signature(self.veggies_file)
+            boxes_signature = file_signature(self.boxes_file)
+            if (veggies_signature == current.veggies_signature
+                    and boxes_signature == current.boxes_signature):
+                return False
+
+            try:
+                catalog = current.catalog
+                box_sources = current.box_sources
+                if veggies_signature != current.veggies_signature:
+                    catalog = self._load_veggies()
+                if boxes_signature != current.boxes_signature:
+                    box_sources = self._load_boxes()
+            except Exception as e:
+                print(f"Error reloading catalog: {str(e)}")
+                return False
+            self._save_cache()
+            boxes, problems = self._resolve_boxes(box_sources, catalog)
+
+            # One assignment publishes the catalog and the boxes together
+            version = current.version + 1
+            self.snapshot = CatalogSnapshot(version, catalog, boxes, box_sources, problems,
+                                            veggies_signature, boxes_signature)
+            listeners = list(self.listeners)
+
+        for listener in listeners:
+            try:
+                listener(version)
+            except Exception as e:
+                print(f"Error notifying catalog listener: {str(e)}")
+        return True
+
+    def subscribe(self, listener: Callable[[int], None]):
+        """Call listener(version) whenever a new catalog version is published"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[int], None]):
+        """Stop notifying a listener"""
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
@@ -1,155 +1,179 @@
-from typing import Dict, List
-from decimal import Decimal
-from view.login import Login
+from typing import Dict, List, Optional, Tuple
 import os
-from decimal import ROUND_HALF_UP
-import pickle
+from datetime import date, timedelta
 from model import *
+from catalog import BOX_SIZES, Catalog, CatalogSnapshot, CatalogWatcher
+from repository import open_store, password_matches
 
 # The Company class is the controller class that manages the data and business logic of the application
 class Company:
-    def __init__(self):
-        '''Initializes the Company class with product data, box configurations, and user data'''
-
-        # Initialize product data lists
-        self.all_veggies_list = []  # Store all vegetables
-        self.veggies_weight_list = []  # Store vegetables sold by weight
-        self.veggies_unit_list = []    # Store vegetables sold by unit
-        self.veggies_pack_list = []    # Store vegetables sold by pack
-        self._parse_veggies()
-        
-        # Initialize box configurations
-        self.smallbox_default_dict = {'price': Decimal('0'), 'contents': []}
-        self.mediumbox_default_dict = {'price': Decimal('0'), 'contents': []}
-        self.largebox_default_dict = {'price': Decimal('0'), 'contents': []}
-        self._parse_premadeboxes()
-
-        # Load user data from pickle files
-        self.private_customers = self.load_data("data/private_customers.pkl")
-        self.corporate_customers = self.load_data("data/corporate_customers.pkl")
-        self.staff_members = self.load_data("data/staffs.pkl")
-
-    def load_data(self, filename):
-        """Load data from pickle files"""
-        with open(filename, 'rb') as file:
-            return pickle.load(file)
-
-    def _parse_veggies(self):
-        """Parse vegetables data from veggies.txt"""
-        try:
-            if not os.path.exists('static/veggies.txt'):
-                raise FileNotFoundError("static/veggies.txt file not found")
-                
-            with open('static/veggies.txt', 'r') as f:
-                lines = f.readlines()
-            
-            current_type = None
-            for line in lines:
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                    
-                if line.startswith('['):
-                    current_type = line[1:-1]  # Remove brackets
-                elif '=' in line and current_type:
-                    name, price = line.split('=')
-                    name = name.strip()
-                    price_decimal = Decimal(price.strip()).quantize(
-                        Decimal('0.01'), rounding=ROUND_HALF_UP
-                    )
-                    formatted_item = f"{name} - ${float(price_decimal):.2f}"
-                    
-                    # Add to appropriate lists based on sales type
-                    self.all_veggies_list.append(formatted_item)
-                    
-                    if 'weight/kg' in name:
-                        self.veggies_weight_list.append(formatted_item)
-                    elif 'unit' in name:
-                        self.veggies_unit_list.append(formatted_item)
-                    elif 'pack' in name:
-                        self.veggies_pack_list.append(formatted_item)
-
-        except FileNotFoundError as e:
-            print(f"File Error: {str(e)}")
-            raise
-            
-    def _parse_premadeboxes(self):
-        """Parse premade box configurations from premadeboxes.txt"""
-        try:
-            if not os.path.exists('static/premadeboxes.txt'):
-                raise FileNotFoundError("static/premadeboxes.txt file not found")
-                
-            with open('static/premadeboxes.txt', 'r') as f:
-                lines = f.readlines()
-            
-            current_size = None
-            for line in lines:
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                    
-                if line.startswith('['):
-                    current_size = line[1:-1].lower()
-                elif '=' in line and current_size:
-                    key, value = line.split('=')
-                    key = key.lower()
-                    
-                    if key == 'price':
-                        # Save box price
-                        box_dict = getattr(self, f"{current_size}box_default_dict")
-                        box_dict['price'] = Decimal(value.strip()).quantize(
-                            Decimal('0.01'), rounding=ROUND_HALF_UP
-                        )
-                    elif key.startswith('item'):
-                        # Save box contents
-                        box_dict = getattr(self, f"{current_size}box_default_dict")
-                        box_dict['contents'].append(value.strip())
-                        
-        except FileNotFoundError as e:
-            print(f"File Error: {str(e)}")
-            raise
+    def __init__(self, backend: str = None, data_dir: str = 'data'):
+        '''Initializes the Company class with product data, box configurations, and user data
+
+        Args:
+            backend (str): Storage backend, 'pickle' (default) or 'sqlite'.
+                Falls back to the FHV_STORAGE environment variable.
+            data_dir (str): Directory containing the data files
+        '''
+
+        # Product catalog and box configurations, loaded on first use and reloaded when their files change
+        self._catalog_watcher: Optional[CatalogWatcher] = None
+
+        # Open the data store shared by all model methods
+        self.store = open_store(backend or os.environ.get('FHV_STORAGE', 'pickle'), data_dir)
+        self.order_repository = self.store.orders
+        set_data_store(self.store)
+
+        # Username -> (role, id); users themselves are only loaded when they log in
+        self.user_index: Dict[str, Tuple[str, str]] = self.store.user_index()
+        self.user_index_rebuilt = False
+
+    def order_cache_stats(self):
+        """Return cache counters of the shared order repository"""
+        return self.order_repository.stats()
+
+    @property
+    def catalog_watcher(self) -> CatalogWatcher:
+        """Watcher of veggies.txt and premadeboxes.txt, which are parsed on first access"""
+        if self._catalog_watcher is None:
+            try:
+                self._catalog_watcher = CatalogWatcher('static/veggies.txt', 'static/premadeboxes.txt')
+            except FileNotFoundError as e:
+                print(f"File Error: {str(e)}")
+                raise
+        return self._catalog_watcher
+
+    @property
+    def catalog_snapshot(self) -> CatalogSnapshot:
+        """Current catalog version; read the catalog and the boxes from one snapshot to keep them consistent"""
+        return self.catalog_watcher.snapshot
+
+    @property
+    def catalog(self) -> Catalog:
+        """Current version of the veggie catalog"""
+        return self.catalog_snapshot.catalog
+
+    @property
+    def premade_boxes(self) -> Dict[str, dict]:
+        """Current premade box configurations keyed by size"""
+        return self.catalog_snapshot.boxes
+
+    def refresh_catalog(self) -> bool:
+        """Reload the catalog files if they changed, notifying subscribed views
+
+        Returns:
+            bool: True if a new catalog version was loaded
+        """
+        return self.catalog_watcher.check()
+
+    # Full user dictionaries, loaded from the store on first use only
+    @property
+    def private_customers(self) -> Dict[str, Customer]:
+        """All private customers keyed by id"""
+        return self.store.load_customers('private')
+
+    @property
+    def corporate_customers(self) -> Dict[str, CorporateCustomer]:
+        """All corporate customers keyed by id"""
+        return self.store.load_customers('corporate')
+
+    @property
+    def staff_members(self) -> Dict[str, Staff]:
+        """All staff members keyed by staff id"""
+        return self.store.load_staff()
+
+    def load_user(self, role: str, user_id: str) -> Optional[Person]:
+        """Load a single user of a role ('staff', 'private' or 'corporate') from the store"""
+        if role == "staff":
+            return self.store.get_staff(user_id)
+        return self.store.get_customer(role, user_id)
+
+    def _find_entry(self, username: str) -> Optional[Tuple[str, str]]:
+        """Return (role, id) for a username with a single index lookup
+
+        A username missing from a saved index (e.g. written by a process that
+        stopped before updating it) triggers one rebuild of the index.
+        """
+        entry = self.user_index.get(username)
+        if entry is None and not self.user_index_rebuilt:
+            self.user_index_rebuilt = True
+            self.user_index = self.store.user_index(rebuild=True)
+            entry = self.user_index.get(username)
+        return entry
+
+    def _find_user(self, username: str) -> Tuple[Optional[Person], Optional[str]]:
+        """Return (user, role) for a username with a single index lookup"""
+        entry = self._find_entry(username)
+        if entry is None:
+            return None, None
+        role, user_id = entry
+        return self.load_user(role, user_id), role
+
+    def sample_users(self, limit: int) -> List[Person]:
+        """Return up to limit users, loading only those users
+
+        Args:
+            limit (int): Maximum number of users
+
+        Returns:
+            List[Person]: Staff first, then private and corporate customers
+        """
+        users = []
+        for role in ("staff", "private", "corporate"):
+            for username, (user_role, user_id) in self.user_index.items():
+                if len(users) >= limit:
+                    return users
+                if user_role == role:
+                    user = self.load_user(role, user_id)
+                    if user is not None:
+                        users.append(user)
+        return users
 
     def get_user(self, username, user_type):
-        """Get user object based on username and user type from corresponding pickle file"""
-        if user_type == "staff":
-            for staff in self.staff_members.values():
-                if staff.username == username:
-                    self.user = staff
-        if user_type == "private":
-            for private_customer in self.private_customers.values():
-                if private_customer.username == username:
-                    self.private_customers = private_customer
-        if user_type == "corporate":
-            for corporate_customer in self.corporate_customers.values():
-                if corporate_customer.username == username:
-                    self.user = corporate_customer
+        """Get user object based on username and user type and make it the current user"""
+        user, role = self._find_user(username)
+        if user is not None and role == user_type:
+            self.user = user
+            return user
+        return None
+
+    def register_customer(self, customer: Customer) -> bool:
+        """Store a new private or corporate customer and index its username
+
+        Args:
+            customer (Customer): The new customer
+
+        Returns:
+            bool: True if registered, False if the username is already taken
+        """
+        if customer.username in self.user_index:
+            return False
+        kind = customer.customer_kind
+        self.store.save_customer(kind, customer)
+        self.user_index[customer.username] = (kind, customer.cust_id)
+        return True
 
     # Login verification function
     def user_login(self,username,password):
-        """Handle user login process"""
-        
-        # Check staffs
-        for staff in self.staff_members.values():  # Changed to iterate through staffs
-            if (staff.username == username and 
-                staff.password == password):
-                self.user = staff
-                return staff, "staff"
-
-        # Check private customers
-        for customer in self.private_customers.values():
-            if (customer.username == username and 
-                customer.password == password):
-                self.user = customer
-                return customer, "customer"
-        
-        # Check corporate customers
-        for customer in self.corporate_customers.values():
-            if (customer.username == username and 
-                customer.password == password):
-                self.user = customer
-                return customer, "customer"
-        
-        return None, None
+        """Handle user login process
+
+        The password is compared in constant time with the salted hash the
+        store keeps next to the username index; the user's stored password
+        is never read.
+        """
+        entry = self._find_entry(username)
+        if entry is None:
+            return None, None
+        credentials = self.store.user_credentials(username)
+        if credentials is None or not password_matches(password, credentials):
+            return None, None
+
+        role, user_id = entry
+        user = self.load_user(role, user_id)
+        if user is None:
+            return None, None
+        self.user = user
+        return user, "staff" if role == "staff" else "customer"
     
     # Staff Methods        
     def staff_all_products(self):
@@ -157,19 +181,16 @@ class Company:
         So the staff shouldn't parse the products data from its model.'''
 
         """Allow staff to view all products"""
+        snapshot = self.catalog_snapshot  # Catalog and boxes of the same version
         text = "Products Catalog \n"
         text += "\n All Vegetables:\n"
-        text += "\n".join([f"• {item}" for item in self.all_veggies_list])
+        text += "\n".join([f"• {item.label}" for item in snapshot.catalog])
         
         text += "\n\n Pre-made Boxes:\n"
-        text += f"\n Small Box (${float(self.smallbox_default_dict['price']):.2f})\n"
-        text += f"  Contents: {', '.join(self.smallbox_default_dict['contents'])}"
-        
-        text += f"\n Medium Box (${float(self.mediumbox_default_dict['price']):.2f})\n"
-        text += f"  Contents: {', '.join(self.mediumbox_default_dict['contents'])}"
-        
-        text += f"\n Large Box (${float(self.largebox_default_dict['price']):.2f})\n"
-        text += f"  Contents: {', '.join(self.largebox_default_dict['contents'])}"
+        for size in BOX_SIZES:
+            box_dict = snapshot.boxes[size]
+            text += f"\n {size.capitalize()} Box (${float(box_dict['price']):.2f})\n"
+            text += f"  Contents: {', '.join(box_dict['contents'])}"
 
         return text
 
@@ -193,10 +214,19 @@ class Company:
         """Generate and view sales reports"""
         return self.user.show_sales_report(start_date, end_date)
 
+    def staff_sales_report_page(self, start_date, end_date, page, page_size=50):
+        """Generate one page of the sales report"""
+        return self.user.sales_report_page(start_date, end_date, page, page_size)
+
     def staff_popular_items(self):
         """View popular items"""
         return self.user.show_popular_products()
 
+    def staff_top_products(self, k=10, days=7):
+        """View the k best-selling products of the last few days (including today)"""
+        end_date = date.today()
+        return self.user.show_top_products(k, end_date - timedelta(days=days - 1), end_date)
+
     def staff_fulfill_order(self, order_id):
         """Process and fulfill customer orders"""
         return self.user.fulfill_order(order_id)
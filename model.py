@@ -1,10 +1,10 @@
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from decimal import Decimal
 from abc import ABC, abstractmethod
-import pickle
 from enum import Enum
 from decimal import Decimal, ROUND_DOWN
+from money import Money, MoneyField, upgrade_money_fields
 
 # Constants for business rules
 MAX_PRIVATE_CUSTOMER_OWING = Decimal('100.00')
@@ -12,6 +12,26 @@ DEFAULT_CORPORATE_DISCOUNT = Decimal('0.10')
 DELIVERY_RADIUS_KM = 20
 DELIVERY_FEE = Decimal('10.00')
 
+# Data store shared by all model objects, installed by controller.Company
+_data_store = None
+
+def set_data_store(store):
+    """Install the data store (PickleStore or SQLiteStore) used by the model methods"""
+    global _data_store
+    _data_store = store
+
+def get_data_store():
+    """Return the shared data store, creating a default pickle store if needed"""
+    global _data_store
+    if _data_store is None:
+        from repository import PickleStore
+        _data_store = PickleStore()
+    return _data_store
+
+def get_order_repository():
+    """Return the order repository of the shared data store"""
+    return get_data_store().orders
+
 class Person:
     '''Person class to store basic information about a person'''
     def __init__(self, first_name: str, last_name: str, username: str, password: str):
@@ -64,30 +84,27 @@ class Staff(Person):
                 Dict[str, Dict[str, Any]]: Dictionary containing pending orders with their details
             """
 
-            # Load orders from pickle file
+            # Load orders through the shared repository
             try:
-                with open('data/orders.pkl', 'rb') as file:
-                    orders = pickle.load(file)
-                    # Filter orders with pending status
-                    pending_orders = {k: v for k, v in orders.items() 
-                                    if v.order_status == OrderStatus.PENDING}
+                # Query orders with pending status
+                pending_orders = get_order_repository().orders_by_status(OrderStatus.PENDING)
                     
-                    # Create the result dictionary
-                    current_orders = {
-                        order.order_number: {
-                            "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
-                            "Date": order.order_date,
-                            "Status": order.order_status.value,
-                            "Items": self._get_order_items_string(order),
-                            "Subtotal": order.subtotal,
-                            "Delivery Fee": order.delivery_fee,
-                            "Total Amount": order.total_amount
-                        } 
-                        # Format order details
-                        for order in pending_orders.values()
-                    }
+                # Create the result dictionary
+                current_orders = {
+                    order.order_number: {
+                        "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
+                        "Date": order.order_date,
+                        "Status": order.order_status.value,
+                        "Items": self._get_order_items_string(order),
+                        "Subtotal": order.subtotal,
+                        "Delivery Fee": order.delivery_fee,
+                        "Total Amount": order.total_amount
+                    } 
+                    # Format order details
+                    for order in pending_orders
+                }
                     
-                    return current_orders
+                return current_orders
             except Exception as e:
                 return {"Error": f"Error loading orders: {str(e)}"}
 
@@ -121,30 +138,27 @@ class Staff(Person):
             Dict[str, Dict[str, Any]]: Dictionary containing fulfilled orders with their details
         """
 
-        # Load orders from pickle file
+        # Load orders through the shared repository
         try:
-            with open('data/orders.pkl', 'rb') as file:
-                orders = pickle.load(file)
-                # Filter fulfilled orders
-                fulfilled_orders = {k: v for k, v in orders.items() 
-                                if v.order_status == OrderStatus.FULFILLED}
+            # Query fulfilled orders
+            fulfilled_orders = get_order_repository().orders_by_status(OrderStatus.FULFILLED)
                 
-                # Create result dictionary
-                previous_orders = {
-                    order.order_number: {
-                        "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
-                        "Date": order.order_date,
-                        "Status": order.order_status.value,
-                        "Items": self._get_order_items_string(order),
-                        "Subtotal": order.subtotal,
-                        "Delivery Fee": order.delivery_fee,
-                        "Total Amount": order.total_amount
-                    } 
-                    # Format order details
-                    for order in fulfilled_orders.values()
-                }
+            # Create result dictionary
+            previous_orders = {
+                order.order_number: {
+                    "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
+                    "Date": order.order_date,
+                    "Status": order.order_status.value,
+                    "Items": self._get_order_items_string(order),
+                    "Subtotal": order.subtotal,
+                    "Delivery Fee": order.delivery_fee,
+                    "Total Amount": order.total_amount
+                } 
+                # Format order details
+                for order in fulfilled_orders
+            }
                 
-                return previous_orders
+            return previous_orders
         except Exception as e:
             return {"Error": f"Error loading orders: {str(e)}"}
         
@@ -156,12 +170,10 @@ class Staff(Person):
             """
             try:
                 # Load private customers
-                with open('data/private_customers.pkl', 'rb') as file:
-                    private_customers = pickle.load(file)
+                private_customers = get_data_store().load_customers('private')
                 
                 # Load corporate customers
-                with open('data/corporate_customers.pkl', 'rb') as file:
-                    corporate_customers = pickle.load(file)
+                corporate_customers = get_data_store().load_customers('corporate')
                 
                 # Initialize formatted strings for display
                 formatted_customers = "\n=== Private Customers ===\n"
@@ -189,12 +201,12 @@ class Staff(Person):
             except Exception as e:
                 return "Error loading customers."
 
-    def show_sales_report(self, start_date: date, end_date: date) -> str:
+    def show_sales_report(self, start_date: Optional[date], end_date: Optional[date]) -> str:
         """Generate a sales report for a specific date range.
         
         Args:
-            start_date (date): Start date of the report period
-            end_date (date): End date of the report period
+            start_date (date): Start date of the report period, None to start at the first order
+            end_date (date): End date of the report period, None to include all later orders
             
         Returns:
             str: Formatted sales report containing:
@@ -203,70 +215,109 @@ class Staff(Person):
                 - Details for each order in the date range
         """
         try:
-            # Load orders from pickle file
-            with open('data/orders.pkl', 'rb') as file:
-                orders = pickle.load(file)
-            
-            # Filter orders within the date range
-            valid_orders = [
-                order for order in orders.values()
-                if start_date <= order.order_date <= end_date
-            ]
-            
-            # Calculate total sales for the period
-            total_sales = sum(order.sales_amount for order in valid_orders)
-            
-            # Initialize report string
-            report = []
-            report.append(f"=== Sales Report ({start_date} to {end_date}) ===")
-            report.append(f"Total Sales: ${total_sales:.2f}\n")
-            
-            # Add details for each order
-            for order in valid_orders:
-                # Order header information
-                report.append(f"Order Number: {order.order_number}")
-                report.append(f"Customer: {order.order_customer.first_name} {order.order_customer.last_name}")
-                report.append(f"Date: {order.order_date}")
-                report.append(f"Delivery Method: {order.delivery_method.value}")
-                
-                # Add order items with proper handling of different types
-                report.append("Items:")
-                for item in order.list_of_items:
-                    if isinstance(item, PremadeBox):
-                        # Handle PremadeBox items
-                        report.append(f"  - {item.item_name} (Box) x {item.quantity} x ${item.price:.2f}")
-                        report.append("    Contents:")
-                        # Add box contents
-                        for content in item.box_content:
-                            if isinstance(content, WeightedVeggie):
-                                report.append(f"      * {content.item_name} ({content.weight}kg)")
-                            elif isinstance(content, PackVeggie):
-                                report.append(f"      * {content.item_name} ({content.num_of_pack} packs)")
-                            elif isinstance(content, UnitPriceVeggie):
-                                report.append(f"      * {content.item_name} ({content.quantity} units)")
-                    else:
-                        # Handle individual veggie items
-                        if isinstance(item, WeightedVeggie):
-                            report.append(f"  - {item.item_name}: {item.weight}kg x ${item.price_per_kilo:.2f}/kg")
-                        elif isinstance(item, PackVeggie):
-                            report.append(f"  - {item.item_name}: {item.num_of_pack} packs x ${item.price_per_pack:.2f}/pack")
-                        elif isinstance(item, UnitPriceVeggie):
-                            report.append(f"  - {item.item_name}: {item.quantity} units x ${item.price_per_unit:.2f}/unit")
-                
-                # Add pricing details
-                report.append(f"Subtotal: ${order.subtotal:.2f}")
-                if isinstance(order.order_customer, CorporateCustomer):
-                    report.append(f"Corporate Discount ({order.order_customer.discount_rate * 100}%): ${order.discount:.2f}")
-                report.append(f"Delivery Fee: ${order.delivery_fee:.2f}")
-                report.append(f"Final Sales Amount: ${order.sales_amount:.2f}\n")
-            
-            return '\n'.join(report)
+            return '\n'.join(self.iter_sales_report(start_date, end_date))
             
         except Exception as e:
             error_msg = f"Error generating sales report: {e}"
             print(error_msg)  # For debugging
             return error_msg
 
+    def iter_sales_report(self, start_date: Optional[date], end_date: Optional[date]) -> Iterator[str]:
+        """Generate a sales report lazily: the header block first, then one block per order
+        
+        Joining the blocks with newlines gives the same text as show_sales_report.
+        
+        Args:
+            start_date (date): Start date of the report period, None to start at the first order
+            end_date (date): End date of the report period, None to include all later orders
+            
+        Yields:
+            str: The report header, then the details of each order in the date range
+        """
+        # Query orders within the date range (references only, formatted one at a time)
+        valid_orders = get_order_repository().orders_between(start_date, end_date)
+        yield self._format_report_header(start_date, end_date)
+        for order in valid_orders:
+            yield self._format_report_order(order)
+
+    def sales_report_page(self, start_date: Optional[date], end_date: Optional[date],
+                          page: int, page_size: int = 50) -> Dict[str, Any]:
+        """Format a single page of the sales report
+        
+        Only the orders on the requested page are read from the repository
+        and formatted; the page count comes from a count of the range.
+        
+        Args:
+            start_date (date): Start date of the report period, None to start at the first order
+            end_date (date): End date of the report period, None to include all later orders
+            page (int): Page number, starting at 0
+            page_size (int): Number of orders per page
+            
+        Returns:
+            Dict[str, Any]: "header", "orders" (formatted blocks of the page), "page" and "page_count"
+        """
+        repository = get_order_repository()
+        page_count = max(1, -(-repository.count_between(start_date, end_date) // page_size))
+        page = min(max(page, 0), page_count - 1)
+        page_orders = repository.orders_between(start_date, end_date, offset=page * page_size, limit=page_size)
+        return {
+            "header": self._format_report_header(start_date, end_date),
+            "orders": [self._format_report_order(order) for order in page_orders],
+            "page": page,
+            "page_count": page_count,
+        }
+
+    def _format_report_header(self, start_date: Optional[date], end_date: Optional[date]) -> str:
+        """Format the sales report header with the total sales of the period"""
+        # Total sales for the period come from the daily rollups
+        total_sales = get_order_repository().sales_totals(start_date, end_date).sales_amount
+        
+        report = []
+        report.append(f"=== Sales Report ({start_date or 'first order'} to {end_date or 'latest order'}) ===")
+        report.append(f"Total Sales: ${total_sales:.2f}\n")
+        return '\n'.join(report)
+
+    def _format_report_order(self, order: 'Order') -> str:
+        """Format the sales report details of a single order"""
+        report = []
+        # Order header information
+        report.append(f"Order Number: {order.order_number}")
+        report.append(f"Customer: {order.order_customer.first_name} {order.order_customer.last_name}")
+        report.append(f"Date: {order.order_date}")
+        report.append(f"Delivery Method: {order.delivery_method.value}")
+        
+        # Add order items with proper handling of different types
+        report.append("Items:")
+        for item in order.list_of_items:
+            if isinstance(item, PremadeBox):
+                # Handle PremadeBox items
+                report.append(f"  - {item.item_name} (Box) x {item.quantity} x ${item.price:.2f}")
+                report.append("    Contents:")
+                # Add box contents
+                for content in item.box_content:
+                    if isinstance(content, WeightedVeggie):
+                        report.append(f"      * {content.item_name} ({content.weight}kg)")
+                    elif isinstance(content, PackVeggie):
+                        report.append(f"      * {content.item_name} ({content.num_of_pack} packs)")
+                    elif isinstance(content, UnitPriceVeggie):
+                        report.append(f"      * {content.item_name} ({content.quantity} units)")
+            else:
+                # Handle individual veggie items
+                if isinstance(item, WeightedVeggie):
+                    report.append(f"  - {item.item_name}: {item.weight}kg x ${item.price_per_kilo:.2f}/kg")
+                elif isinstance(item, PackVeggie):
+                    report.append(f"  - {item.item_name}: {item.num_of_pack} packs x ${item.price_per_pack:.2f}/pack")
+                elif isinstance(item, UnitPriceVeggie):
+                    report.append(f"  - {item.item_name}: {item.quantity} units x ${item.price_per_unit:.2f}/unit")
+        
+        # Add pricing details
+        report.append(f"Subtotal: ${order.subtotal:.2f}")
+        if isinstance(order.order_customer, CorporateCustomer):
+            report.append(f"Corporate Discount ({order.order_customer.discount_rate * 100}%): ${order.discount:.2f}")
+        report.append(f"Delivery Fee: ${order.delivery_fee:.2f}")
+        report.append(f"Final Sales Amount: ${order.sales_amount:.2f}\n")
+        return '\n'.join(report)
+
     def show_popular_products(self) -> str:
         """Show popular products based on quantity sold across different categories
         
@@ -274,47 +325,12 @@ class Staff(Person):
             str: Formatted string listing popular products and their total quantities sold
         """
         try:
-            # Load orders from pickle file
-            with open('data/orders.pkl', 'rb') as file:
-                orders = pickle.load(file)
-            
-            # Initialize dictionaries for product quantities
-            veggie_sales = {}     # For all veggie products
-            premade_box_sales = {} # For premade boxes
-
-            # Count sales for each product
-            for order in orders.values():
-                for item in order.list_of_items:
-                    # Handle veggie products
-                    # Check the type of item and update the sales quantity
-                    if isinstance(item, WeightedVeggie) or isinstance(item, UnitPriceVeggie) or isinstance(item, PackVeggie):
-                        item_name = item.item_name
-                        if isinstance(item, WeightedVeggie):
-                            veggie_sales[item_name] = veggie_sales.get(item_name, 0) + item.weight
-                        elif isinstance(item, UnitPriceVeggie):
-                            veggie_sales[item_name] = veggie_sales.get(item_name, 0) + item.quantity
-                        elif isinstance(item, PackVeggie):
-                            veggie_sales[item_name] = veggie_sales.get(item_name, 0) + item.num_of_pack
-                    
-                    # Handle premade boxes
-                    if isinstance(item, PremadeBox):
-                        box_name = item.item_name
-                        # Count the premade box
-                        premade_box_sales[box_name] = premade_box_sales.get(box_name, 0) + item.quantity
-                        
-                        # Count box contents
-                        for content in item.box_content:
-                            content_name = content.item_name
-                            if isinstance(content, WeightedVeggie):
-                                veggie_sales[content_name] = veggie_sales.get(content_name, 0) + content.weight
-                            elif isinstance(content, UnitPriceVeggie):
-                                veggie_sales[content_name] = veggie_sales.get(content_name, 0) + content.quantity
-                            elif isinstance(content, PackVeggie):
-                                veggie_sales[content_name] = veggie_sales.get(content_name, 0) + content.num_of_pack
+            # Read the running product counters maintained at checkout
+            product_sales = get_order_repository().product_sales()
 
             # Sort sales data
-            sorted_veggie_sales = sorted(veggie_sales.items(), key=lambda x: x[1], reverse=True)
-            sorted_premade_box_sales = sorted(premade_box_sales.items(), key=lambda x: x[1], reverse=True)
+            sorted_veggie_sales = sorted(product_sales.veggies.items(), key=lambda x: x[1], reverse=True)
+            sorted_premade_box_sales = sorted(product_sales.boxes.items(), key=lambda x: x[1], reverse=True)
 
             # Format the report
             formatted_products = "\n=== Popular Products by Category ===\n"
@@ -332,6 +348,35 @@ class Staff(Person):
         
         except Exception as e:
             return f"Error generating popular products report: {e}"
+
+    def show_top_products(self, k: int = 10, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> str:
+        """Show the k best-selling veggies and premade boxes of a date window
+        
+        Args:
+            k (int): Number of products per category
+            start_date (date): First day of the window, None for all history
+            end_date (date): Last day of the window, None for all history
+            
+        Returns:
+            str: Formatted top-k list per category
+        """
+        try:
+            product_sales = get_order_repository().product_sales(start_date, end_date)
+
+            formatted_products = f"\n=== Top {k} Products ({start_date or 'first order'} to {end_date or 'latest order'}) ===\n"
+            formatted_products += "\n[Veggie Products]\n"
+            for rank, (item_name, total_quantity) in enumerate(product_sales.top(k, 'veggie'), 1):
+                formatted_products += f"{rank}. {item_name}: {total_quantity:.2f} sold\n"
+
+            formatted_products += "\n[Premade Boxes]\n"
+            for rank, (box_name, quantity) in enumerate(product_sales.top(k, 'box'), 1):
+                formatted_products += f"{rank}. {box_name}: {quantity} sold\n"
+
+            return formatted_products
+
+        except Exception as e:
+            return f"Error generating top products report: {e}"
         
     def fulfill_order(self, order_number: str) -> bool:
             """Update order status from pending to fulfilled
@@ -343,23 +388,9 @@ class Staff(Person):
                 bool: True if successful, False otherwise
             """
             try:
-                with open('data/orders.pkl', 'rb') as file:
-                    orders = pickle.load(file)
-                
-                # Check if order exists
-                order = orders.get(order_number)
-                if not order:
-                    return False
-                
-                # Update order status
-                order.order_status = OrderStatus.FULFILLED
-                orders[order_number] = order
-                
-                # Save updated orders
-                with open('data/orders.pkl', 'wb') as file:
-                    pickle.dump(orders, file)
-                
-                return True
+                # Append a single status-change record to the order journal;
+                # returns False if the order doesn't exist
+                return get_order_repository().update_status(order_number, OrderStatus.FULFILLED)
             except Exception as e:
                 print(f"Error fulfilling order: {e}")
                 return False
@@ -370,6 +401,9 @@ class DeliveryMethod(Enum):
     DELIVERY = "delivery"
 
 class Customer(Person):
+    # Name of the customer store this class is saved in
+    customer_kind = 'private'
+
     def __init__(self, first_name: str, last_name: str, username: str, password: str, 
                  cust_address: str, cust_balance: Decimal, max_owing: Decimal, cust_id: str):
         """Initialize a customer
@@ -388,7 +422,6 @@ class Customer(Person):
         self.cust_address = cust_address
         self.cust_balance = cust_balance
         self.max_owing = max_owing
-        self.list_of_orders = []
         self.list_of_payments = []
         self.cust_id = cust_id
         # Determine delivery availability based on address
@@ -398,6 +431,16 @@ class Customer(Person):
         except ValueError:
             self.can_delivery = False
 
+    def __setstate__(self, state: dict):
+        """Restore a pickled customer, dropping the order list older pickles embedded"""
+        state.pop('list_of_orders', None)
+        self.__dict__.update(state)
+
+    @property
+    def list_of_orders(self) -> List['Order']:
+        """Orders placed by this customer, read from the order repository"""
+        return get_order_repository().orders_for_customer(self.cust_id)
+
     def __str__(self) -> str:
         """Return string representation of customer"""
         return (f"Customer ID: {self.cust_id}\n"
@@ -418,14 +461,12 @@ class Customer(Person):
             bool: True if customer can place order, False otherwise
         """
         try:
-            with open('data/private_customers.pkl', 'rb') as file:
-                customers = pickle.load(file)
-                customer = customers.get(self.cust_id)
-                if customer:
-                    potential_balance = customer.cust_balance + order_amount
-                    can_place = potential_balance <= customer.max_owing
-                    return can_place
-                return False
+            customer = get_data_store().get_customer('private', self.cust_id)
+            if customer:
+                potential_balance = customer.cust_balance + order_amount
+                can_place = potential_balance <= customer.max_owing
+                return can_place
+            return False
         except Exception as e:
             print(f"Error checking order possibility: {e}")
             return False
@@ -435,38 +476,16 @@ class Customer(Person):
                     payment_method: str, **kwargs) -> bool:
         """Make payment using credit or debit card"""
         try:
-            # Initialize payments if file doesn't exist
-            try:
-                with open('data/payments.pkl', 'rb') as file:
-                    payments = pickle.load(file)
-            except FileNotFoundError:
-                payments = {}
-                
             # Create payment record
-            if payment_method == "credit":
-                payment = CreditCardPayment(
-                    payment_amount=payment_amount,
-                    payment_date=payment_date,
-                    card_number=kwargs['card_number'],
-                    card_type=kwargs['card_type'],
-                    card_expiry_date=kwargs['card_expiry_date'], 
-                    cvv=kwargs['cvv'],
-                    card_holder=kwargs['card_holder']
-                )
-            elif payment_method == "debit":
-                payment = DebitCardPayment(
-                    payment_amount=payment_amount,
-                    payment_date=payment_date,
-                    bank_name=kwargs['bank_name'],
-                    debit_card_num=kwargs['debit_card_num']
-                )
-            else:
-                raise ValueError(f"Unsupported payment method: {payment_method}")
+            payment = self._create_payment(
+                payment_amount=payment_amount,
+                payment_date=payment_date,
+                payment_method=payment_method,
+                **kwargs
+            )
 
             # Save payment record
-            payments[payment.payment_id] = payment
-            with open('data/payments.pkl', 'wb') as file:
-                pickle.dump(payments, file)
+            get_data_store().add_payment(payment)
 
             return True
         except Exception as e:
@@ -474,107 +493,85 @@ class Customer(Person):
             return False
 
 
-    def check_out_with_payment(self, order_data: dict, payment_method: str, *, 
-                    card_number: str = None,
-                    card_type: str = None, 
-                    card_expiry_date: date = None,
-                    cvv: str = None,
-                    card_holder: str = None,
-                    bank_name: str = None,
-                    debit_card_num: str = None) -> bool:
-        """Process checkout with immediate payment"""
-        try:
-            # Create Order instance first
-            items = []
-            for cart_item in order_data['cart_items']:
-                item_type = cart_item['type']
-                name = cart_item['name']
-                price = cart_item['price']
-                quantity = cart_item['quantity']
-                
-                if item_type == 'weight':
-                    item = WeightedVeggie(name, quantity, price)
-                elif item_type == 'unit':
-                    item = UnitPriceVeggie(name, int(quantity), price)
-                elif item_type == 'pack':
-                    item = PackVeggie(name, int(quantity), price)
-                elif item_type == 'box':
-                    item = PremadeBox(name, int(quantity), price)
-                    if cart_item['contents']:
-                        contents = []
-                        for content in cart_item['contents'].split(', '):
-                            veg_name = content.split(' x ')[0]
-                            contents.append(Veggie(veg_name))
-                        item.set_content(contents)
-                
-                item.calculate_total()
-                items.append(item)
-
-            # Create order instance
-            order = Order(
-                order_customer=order_data['user'],
-                order_date=date.today(),
-                delivery_method=DeliveryMethod.DELIVERY if order_data['is_delivery'] else DeliveryMethod.PICKUP
+    def _create_payment(self, *, payment_amount: Decimal, payment_date: date,
+                        payment_method: str, **kwargs) -> 'Payment':
+        """Create a credit or debit card payment record without storing it"""
+        if payment_method == "credit":
+            return CreditCardPayment(
+                payment_amount=payment_amount,
+                payment_date=payment_date,
+                card_number=kwargs['card_number'],
+                card_type=kwargs['card_type'],
+                card_expiry_date=kwargs['card_expiry_date'], 
+                cvv=kwargs['cvv'],
+                card_holder=kwargs['card_holder']
             )
-            order.set_items(items)
-
-            # Process payment based on method
-            if payment_method == "account":
-                if not self.can_place_order(order.total_amount):
-                    return False
-                if not self.charge_to_account(order.total_amount):
-                    return False
-            else:
-                # Handle credit/debit card payment
-                success = self.make_payment(
-                    payment_amount=order.total_amount,
-                    payment_date=date.today(),
-                    payment_method=payment_method,
-                    card_number=card_number,
-                    card_type=card_type,
-                    card_expiry_date=card_expiry_date,
-                    cvv=cvv,
-                    card_holder=card_holder,
-                    bank_name=bank_name,
-                    debit_card_num=debit_card_num
-                )
-                
-                if not success:
-                    print("Payment processing failed")
-                    return False
-
-            try:
-                # Load and save order
-                with open('data/orders.pkl', 'rb') as file:
-                    orders = pickle.load(file)
-            except FileNotFoundError:
-                orders = {}
-
-            try:
-                # Load and save customer
-                with open('data/private_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-            except FileNotFoundError:
-                customers = {}
-
-            # Update order and save
-            order.order_status = OrderStatus.PENDING
-            self.list_of_orders.append(order)
-            orders[order.order_number] = order
-            customers[self.cust_id] = self
-
-            # Save updates
-            with open('data/orders.pkl', 'wb') as file:
-                pickle.dump(orders, file)
-            with open('data/private_customers.pkl', 'wb') as file:
-                pickle.dump(customers, file)
+        elif payment_method == "debit":
+            return DebitCardPayment(
+                payment_amount=payment_amount,
+                payment_date=payment_date,
+                bank_name=kwargs['bank_name'],
+                debit_card_num=kwargs['debit_card_num']
+            )
+        raise ValueError(f"Unsupported payment method: {payment_method}")
 
-            return True
+    def _create_order(self, order_data: dict) -> 'Order':
+        """Create an order with calculated amounts from the checkout cart data
 
-        except Exception as e:
-            print(f"Error in check_out_with_payment: {str(e)}")
-            return False
+        Box contents arrive as catalog ids ('content_ids') and are resolved
+        against the catalog version the cart was filled from
+        (order_data['catalog']), so each content keeps its sale type and price.
 
+        Raises:
+            ValueError: If a box content is not in the catalog
+        """
+        items = []
+        for cart_item in order_data['cart_items']:
+            item_type = cart_item['type']
+            name = cart_item['name']
+            price = cart_item['price']
+            quantity = cart_item['quantity']
+            
+            if item_type == 'box':
+                item = PremadeBox(name, int(quantity), price)
+                contents = []
+                for item_id in cart_item['content_ids']:
+                    product = order_data['catalog'].get(item_id)
+                    if product is None:
+                        raise ValueError(f"Box item {item_id} is not in the catalog")
+                    content = self._create_veggie(product.sale_type, product.name, 1, product.price.to_decimal())
+                    content.calculate_total()
+                    contents.append(content)
+                item.set_content(contents)
+            else:
+                item = self._create_veggie(item_type, name, quantity, price)
+            
+            item.calculate_total()
+            items.append(item)
+
+        # Create order instance
+        order = Order(
+            order_customer=self,  # Use self as customer
+            order_date=date.today(),
+            delivery_method=DeliveryMethod.DELIVERY if order_data['is_delivery'] else DeliveryMethod.PICKUP
+        )
+        order.set_items(items)
+        return order
+
+    @staticmethod
+    def _create_veggie(sale_type: str, name: str, quantity, price: Decimal) -> 'Veggie':
+        """Create the veggie item of a sale type ('weight', 'unit' or 'pack')
+
+        Raises:
+            ValueError: If the sale type is unknown
+        """
+        if sale_type == 'weight':
+            return WeightedVeggie(name, quantity, price)
+        if sale_type == 'unit':
+            return UnitPriceVeggie(name, int(quantity), price)
+        if sale_type == 'pack':
+            return PackVeggie(name, int(quantity), price)
+        raise ValueError(f"Unknown sale type: {sale_type}")
 
     def check_out_with_payment(self, order_data: dict, payment_method: str, *, 
                     card_number: str = None,
@@ -584,52 +581,19 @@ class Customer(Person):
                     card_holder: str = None,
                     bank_name: str = None,
                     debit_card_num: str = None) -> bool:
-        """Process checkout with immediate payment"""
+        """Process checkout with immediate payment
+
+        The data store validates the credit limit and commits the order,
+        the new balance and the card payment together in one atomic write.
+        """
         try:
-            # Create Order instance first
-            items = []
-            for cart_item in order_data['cart_items']:
-                item_type = cart_item['type']
-                name = cart_item['name']
-                price = cart_item['price']
-                quantity = cart_item['quantity']
-                
-                if item_type == 'weight':
-                    item = WeightedVeggie(name, quantity, price)
-                elif item_type == 'unit':
-                    item = UnitPriceVeggie(name, int(quantity), price)
-                elif item_type == 'pack':
-                    item = PackVeggie(name, int(quantity), price)
-                elif item_type == 'box':
-                    item = PremadeBox(name, int(quantity), price)
-                    if cart_item['contents']:
-                        contents = []
-                        for content in cart_item['contents'].split(', '):
-                            # Extract veggie name and create appropriate veggie instance
-                            veg_name = content.split(' x ')[0]
-                            contents.append(UnitPriceVeggie(veg_name, 1, Decimal('0.00')))
-                        item.set_content(contents)
-                
-                item.calculate_total()
-                items.append(item)
-
-            # Create order instance
-            order = Order(
-                order_customer=self,  # Use self as customer
-                order_date=date.today(),
-                delivery_method=DeliveryMethod.DELIVERY if order_data['is_delivery'] else DeliveryMethod.PICKUP
-            )
-            order.set_items(items)
+            order = self._create_order(order_data)
+            order.order_status = OrderStatus.PENDING
 
-            # Process payment based on method
-            if payment_method == "account":
-                if not self.can_place_order(order.total_amount):
-                    return False
-                if not self.charge_to_account(order.total_amount):
-                    return False
-            else:
-                # Handle credit/debit card payment
-                success = self.make_payment(
+            # Build the card payment record; account payments are charged by the store
+            payment = None
+            if payment_method != "account":
+                payment = self._create_payment(
                     payment_amount=order.total_amount,
                     payment_date=date.today(),
                     payment_method=payment_method,
@@ -641,37 +605,13 @@ class Customer(Person):
                     bank_name=bank_name,
                     debit_card_num=debit_card_num
                 )
-                
-                if not success:
-                    print("Payment processing failed")
-                    return False
-
-            # Initialize dictionaries if files don't exist
-            try:
-                with open('data/orders.pkl', 'rb') as file:
-                    orders = pickle.load(file)
-            except FileNotFoundError:
-                orders = {}
 
-            try:
-                with open('data/private_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-            except FileNotFoundError:
-                customers = {}
-
-            # Update order and save
-            order.order_status = OrderStatus.PENDING
-            self.list_of_orders.append(order)
-            orders[order.order_number] = order
-            customers[self.cust_id] = self
-
-            # Save updates
-            with open('data/orders.pkl', 'wb') as file:
-                pickle.dump(orders, file)
-            with open('data/private_customers.pkl', 'wb') as file:
-                pickle.dump(customers, file)
-
-            return True
+            # Commit order, balance and payment as a single unit of work
+            return get_data_store().check_out(
+                self.customer_kind, self, order,
+                payment=payment,
+                charge_to_account=payment_method == "account"
+            )
 
         except Exception as e:
             print(f"Error in check_out_with_payment: {str(e)}")
@@ -687,18 +627,14 @@ class Customer(Person):
                 bool: True if charge successful, False otherwise
             """
             try:
-                with open('data/private_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-                    if self.cust_id not in customers:
-                        return False
-                    
-                    self.cust_balance += amount
-                    customers[self.cust_id] = self
-                    
-                    with open('data/private_customers.pkl', 'wb') as file:
-                        pickle.dump(customers, file)
+                store = get_data_store()
+                if store.get_customer('private', self.cust_id) is None:
+                    return False
+                
+                self.cust_balance += amount
+                store.save_customer('private', self)
                 
-                    return True
+                return True
             except Exception as e:
                 print(f"Error charging to account: {e}")
                 return False
@@ -710,30 +646,24 @@ class Customer(Person):
             Dict[str, Dict[str, Any]]: Dictionary containing customer's pending orders with their details
         """
         try:
-            with open('data/orders.pkl', 'rb') as file:
-                orders = pickle.load(file)
-                # Filter orders for current customer and pending status
-                pending_orders = {
-                    k: v for k, v in orders.items() 
-                    if v.order_customer.cust_id == self.cust_id 
-                    and v.order_status == OrderStatus.PENDING
-                }
+            # Query this customer's pending orders through the per-customer index
+            pending_orders = get_order_repository().orders_for_customer(self.cust_id, OrderStatus.PENDING)
                 
-                # Create the result dictionary with the same format as staff view
-                current_orders = {
-                    order.order_number: {
-                        "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
-                        "Date": order.order_date,
-                        "Status": order.order_status.value,
-                        "Items": self._get_order_items_string(order),
-                        "Subtotal": order.subtotal,
-                        "Delivery Fee": order.delivery_fee,
-                        "Total Amount": order.total_amount
-                    } 
-                    for order in pending_orders.values()
-                }
+            # Create the result dictionary with the same format as staff view
+            current_orders = {
+                order.order_number: {
+                    "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
+                    "Date": order.order_date,
+                    "Status": order.order_status.value,
+                    "Items": self._get_order_items_string(order),
+                    "Subtotal": order.subtotal,
+                    "Delivery Fee": order.delivery_fee,
+                    "Total Amount": order.total_amount
+                } 
+                for order in pending_orders
+            }
                 
-                return current_orders
+            return current_orders
         except Exception as e:
             return {"Error": f"Error loading orders: {str(e)}"}
 
@@ -744,30 +674,24 @@ class Customer(Person):
             Dict[str, Dict[str, Any]]: Dictionary containing customer's fulfilled orders with their details
         """
         try:
-            with open('data/orders.pkl', 'rb') as file:
-                orders = pickle.load(file)
-                # Filter orders for current customer and fulfilled status
-                fulfilled_orders = {
-                    k: v for k, v in orders.items() 
-                    if v.order_customer.cust_id == self.cust_id 
-                    and v.order_status == OrderStatus.FULFILLED
-                }
+            # Query this customer's fulfilled orders through the per-customer index
+            fulfilled_orders = get_order_repository().orders_for_customer(self.cust_id, OrderStatus.FULFILLED)
                 
-                # Create the result dictionary with the same format as staff view
-                previous_orders = {
-                    order.order_number: {
-                        "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
-                        "Date": order.order_date,
-                        "Status": order.order_status.value,
-                        "Items": self._get_order_items_string(order),
-                        "Subtotal": order.subtotal,
-                        "Delivery Fee": order.delivery_fee,
-                        "Total Amount": order.total_amount
-                    } 
-                    for order in fulfilled_orders.values()
-                }
+            # Create the result dictionary with the same format as staff view
+            previous_orders = {
+                order.order_number: {
+                    "Customer": f"{order.order_customer.first_name} {order.order_customer.last_name}",
+                    "Date": order.order_date,
+                    "Status": order.order_status.value,
+                    "Items": self._get_order_items_string(order),
+                    "Subtotal": order.subtotal,
+                    "Delivery Fee": order.delivery_fee,
+                    "Total Amount": order.total_amount
+                } 
+                for order in fulfilled_orders
+            }
                 
-                return previous_orders
+            return previous_orders
         except Exception as e:
             return {"Error": f"Error loading orders: {str(e)}"}
 
@@ -798,28 +722,26 @@ class Customer(Person):
                 bool: True if payment successful, False otherwise
             """
             try:
-                with open('data/private_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-                    if self.cust_id not in customers:
-                        return False
-                    
-                    # Ensure payment amount doesn't exceed current balance
-                    if payment_amount > abs(self.cust_balance):
-                        return False
-                        
-                    # Reduce balance by payment amount
-                    self.cust_balance -= payment_amount  
-                    customers[self.cust_id] = self
-                    
-                    with open('data/private_customers.pkl', 'wb') as file:
-                        pickle.dump(customers, file)
+                store = get_data_store()
+                if store.get_customer('private', self.cust_id) is None:
+                    return False
+                
+                # Ensure payment amount doesn't exceed current balance
+                if payment_amount > abs(self.cust_balance):
+                    return False
                     
-                    return True
+                # Reduce balance by payment amount
+                self.cust_balance -= payment_amount  
+                store.save_customer('private', self)
+                
+                return True
             except Exception as e:
                 print(f"Error processing payment: {e}")
                 return False
 
 class CorporateCustomer(Customer):
+    customer_kind = 'corporate'
+
     def __init__(self, first_name: str, last_name: str, username: str, password: str, 
                  cust_address: str, cust_balance: Decimal, max_owing: Decimal, 
                  discount_rate: Decimal, corporate_cust_id: str):
@@ -855,14 +777,12 @@ class CorporateCustomer(Customer):
             bool: True if customer can place order, False otherwise
         """
         try:
-            with open('data/corporate_customers.pkl', 'rb') as file:
-                customers = pickle.load(file)
-                customer = customers.get(self.cust_id)
-                if customer:
-                    potential_balance = customer.cust_balance + order_amount
-                    can_place = potential_balance <= customer.max_owing
-                    return can_place
-                return False
+            customer = get_data_store().get_customer('corporate', self.cust_id)
+            if customer:
+                potential_balance = customer.cust_balance + order_amount
+                can_place = potential_balance <= customer.max_owing
+                return can_place
+            return False
         except Exception as e:
             print(f"Error checking order possibility: {e}")
             return False
@@ -877,128 +797,23 @@ class CorporateCustomer(Customer):
                 bool: True if payment successful, False otherwise
             """
             try:
-                with open('data/corporate_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-                    if self.cust_id not in customers:
-                        return False
-                    
-                    # Ensure payment amount doesn't exceed current balance
-                    if payment_amount > abs(self.cust_balance):
-                        return False
-                        
-                    # Reduce balance by payment amount
-                    self.cust_balance -= payment_amount  # Add positive amount to negative balance
-                    customers[self.cust_id] = self
-                    
-                    with open('data/corporate_customers.pkl', 'wb') as file:
-                        pickle.dump(customers, file)
+                store = get_data_store()
+                if store.get_customer('corporate', self.cust_id) is None:
+                    return False
+                
+                # Ensure payment amount doesn't exceed current balance
+                if payment_amount > abs(self.cust_balance):
+                    return False
                     
-                    return True
+                # Reduce balance by payment amount
+                self.cust_balance -= payment_amount  # Add positive amount to negative balance
+                store.save_customer('corporate', self)
+                
+                return True
             except Exception as e:
                 print(f"Error processing corporate payment: {e}")
                 return False
 
-    def check_out_with_payment(self, order_data: dict, payment_method: str, *, 
-                card_number: str = None,
-                card_type: str = None, 
-                card_expiry_date: date = None,
-                cvv: str = None,
-                card_holder: str = None,
-                bank_name: str = None,
-                debit_card_num: str = None) -> bool:
-        """Process checkout with immediate payment for corporate customer"""
-        try:
-            # Create Order instance first
-            items = []
-            for cart_item in order_data['cart_items']:
-                item_type = cart_item['type']
-                name = cart_item['name']
-                price = cart_item['price']
-                quantity = cart_item['quantity']
-                
-                if item_type == 'weight':
-                    item = WeightedVeggie(name, quantity, price)
-                elif item_type == 'unit':
-                    item = UnitPriceVeggie(name, int(quantity), price)
-                elif item_type == 'pack':
-                    item = PackVeggie(name, int(quantity), price)
-                elif item_type == 'box':
-                    item = PremadeBox(name, int(quantity), price)
-                    if cart_item['contents']:
-                        contents = []
-                        for content in cart_item['contents'].split(', '):
-                            # Extract veggie name and create appropriate veggie instance
-                            veg_name = content.split(' x ')[0]
-                            contents.append(UnitPriceVeggie(veg_name, 1, Decimal('0.00')))
-                        item.set_content(contents)
-                
-                item.calculate_total()
-                items.append(item)
-
-            # Create order instance with corporate customer
-            order = Order(
-                order_customer=self,  # Use self as customer
-                order_date=date.today(),
-                delivery_method=DeliveryMethod.DELIVERY if order_data['is_delivery'] else DeliveryMethod.PICKUP
-            )
-            order.set_items(items)
-
-            # Process payment based on method
-            if payment_method == "account":
-                if not self.can_place_order(order.total_amount):
-                    return False
-                if not self.charge_to_account(order.total_amount):
-                    return False
-            else:
-                # Handle credit/debit card payment
-                success = self.make_payment(
-                    payment_amount=order.total_amount,
-                    payment_date=date.today(),
-                    payment_method=payment_method,
-                    card_number=card_number,
-                    card_type=card_type,
-                    card_expiry_date=card_expiry_date,
-                    cvv=cvv,
-                    card_holder=card_holder,
-                    bank_name=bank_name,
-                    debit_card_num=debit_card_num
-                )
-                
-                if not success:
-                    print("Payment processing failed")
-                    return False
-
-            # Initialize dictionaries if files don't exist
-            try:
-                with open('data/orders.pkl', 'rb') as file:
-                    orders = pickle.load(file)
-            except FileNotFoundError:
-                orders = {}
-
-            try:
-                with open('data/corporate_customers.pkl', 'rb') as file:
-                    customers = pickle.load(file)
-            except FileNotFoundError:
-                customers = {}
-
-            # Update order and save
-            order.order_status = OrderStatus.PENDING
-            self.list_of_orders.append(order)
-            orders[order.order_number] = order
-            customers[self.cust_id] = self
-
-            # Save updates
-            with open('data/orders.pkl', 'wb') as file:
-                pickle.dump(orders, file)
-            with open('data/corporate_customers.pkl', 'wb') as file:
-                pickle.dump(customers, file)
-
-            return True
-
-        except Exception as e:
-            print(f"Error in check_out_with_payment: {str(e)}")
-            return False
-
     def charge_to_account(self, amount: Decimal) -> bool:
         """Charge amount to corporate customer account
         
@@ -1009,18 +824,14 @@ class CorporateCustomer(Customer):
             bool: True if charge successful, False otherwise
         """
         try:
-            with open('data/corporate_customers.pkl', 'rb') as file:
-                customers = pickle.load(file)
-                if self.cust_id not in customers:
-                    return False
-                
-                self.cust_balance += amount
-                customers[self.cust_id] = self
-                
-                with open('data/corporate_customers.pkl', 'wb') as file:
-                    pickle.dump(customers, file)
-                
-                return True
+            store = get_data_store()
+            if store.get_customer('corporate', self.cust_id) is None:
+                return False
+            
+            self.cust_balance += amount
+            store.save_customer('corporate', self)
+            
+            return True
         except Exception as e:
             print(f"Error charging to corporate account: {e}")
             return False
@@ -1084,6 +895,13 @@ class DebitCardPayment(Payment):
 
 class Order:
     order_id = 1000
+
+    # Amounts are kept as integer cents and read as Decimals
+    delivery_fee = MoneyField()
+    subtotal = MoneyField()
+    discount = MoneyField()
+    sales_amount = MoneyField()
+    total_amount = MoneyField()
     
     def __init__(self, order_customer: 'Customer', order_date: date, delivery_method: DeliveryMethod):
         """Initialize an order
@@ -1106,6 +924,34 @@ class Order:
         self.sales_amount = Decimal('0.00')  # After discount
         self.total_amount = Decimal('0.00')  # Final total including delivery
 
+    @property
+    def order_customer(self) -> Optional['Customer']:
+        """Customer placing the order, resolved through the data store on first access"""
+        if self._customer is None:
+            self._customer = get_data_store().get_customer(self.customer_kind, self.cust_id)
+        return self._customer
+
+    @order_customer.setter
+    def order_customer(self, customer: 'Customer'):
+        self._customer = customer
+        self.cust_id = customer.cust_id
+        self.customer_kind = customer.customer_kind
+
+    def __getstate__(self) -> dict:
+        """Pickle the customer as a reference (cust_id and customer_kind) only"""
+        state = self.__dict__.copy()
+        state['_customer'] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        """Restore a pickled order, turning the customer older pickles embedded into a reference"""
+        customer = state.pop('order_customer', None)
+        if customer is not None:
+            state['cust_id'] = customer.cust_id
+            state['customer_kind'] = customer.customer_kind
+        state['_customer'] = None
+        self.__dict__.update(upgrade_money_fields(Order, state))
+
     def __str__(self) -> str:
         """String representation of the order"""
         lines = [
@@ -1143,24 +989,46 @@ class Order:
         self.list_of_items = items
         self.calculate_all_amounts()
 
+    def product_quantities(self) -> List[tuple]:
+        """Return (category, name, quantity) for every product in the order
+
+        The category is 'box' for premade boxes and 'veggie' for veggies,
+        including the veggies inside premade boxes.
+        """
+        quantities = []
+        for item in self.list_of_items:
+            if isinstance(item, PremadeBox):
+                quantities.append(('box', item.item_name, item.quantity))
+                veggies = item.box_content
+            else:
+                veggies = [item]
+            for veggie in veggies:
+                if isinstance(veggie, WeightedVeggie):
+                    quantities.append(('veggie', veggie.item_name, veggie.weight))
+                elif isinstance(veggie, UnitPriceVeggie):
+                    quantities.append(('veggie', veggie.item_name, veggie.quantity))
+                elif isinstance(veggie, PackVeggie):
+                    quantities.append(('veggie', veggie.item_name, veggie.num_of_pack))
+        return quantities
+
     def calculate_subtotal(self):
         """Calculate subtotal from all items"""
-        self.subtotal = sum(item.total_price for item in self.list_of_items).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        self.subtotal_cents = sum(item.total_price_cents for item in self.list_of_items)
 
     def calculate_discount(self):
-        """Calculate discount if customer is corporate"""
+        """Calculate discount if customer is corporate (rounded down to the cent)"""
         if isinstance(self.order_customer, CorporateCustomer):
-            self.discount = (self.subtotal * self.order_customer.discount_rate).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+            self.discount_cents = Money(self.subtotal_cents).multiply(self.order_customer.discount_rate, ROUND_DOWN).cents
         else:
-            self.discount = Decimal('0.00')
+            self.discount_cents = 0
 
     def calculate_sales_amount(self):
         """Calculate sales amount (subtotal - discount)"""
-        self.sales_amount = self.subtotal - self.discount
+        self.sales_amount_cents = self.subtotal_cents - self.discount_cents
 
     def calculate_total_amount(self):
         """Calculate final total amount including delivery fee"""
-        self.total_amount = self.sales_amount + self.delivery_fee
+        self.total_amount_cents = self.sales_amount_cents + self.delivery_fee_cents
 
     def calculate_all_amounts(self):
         """Calculate all amounts in the correct order"""
@@ -1170,6 +1038,9 @@ class Order:
         self.calculate_total_amount()
 
 class Item(ABC):
+    # Amounts are kept as integer cents and read as Decimals
+    total_price = MoneyField()
+
     def __init__(self, name: str):
         """Initialize an item
         
@@ -1177,7 +1048,11 @@ class Item(ABC):
             name (str): Name of the item
         """
         self.item_name = name
-        self.total_price = Decimal('0.00')
+        self.total_price_cents = 0
+
+    def __setstate__(self, state: dict):
+        """Restore a pickled item, converting the Decimal amounts of older pickles to cents"""
+        self.__dict__.update(upgrade_money_fields(type(self), state))
 
     @abstractmethod
     def calculate_total(self):
@@ -1198,6 +1073,8 @@ class Veggie(Item):
         return f"Name: {self.item_name}\n"
 
 class WeightedVeggie(Veggie):
+    price_per_kilo = MoneyField()
+
     def __init__(self, veg_name: str, weight: Decimal, weight_per_kilo: Decimal):
         """Initialize a weighted vegetable item
         
@@ -1208,17 +1085,19 @@ class WeightedVeggie(Veggie):
         """
         super().__init__(veg_name)
         self.weight = Decimal(str(weight))
-        self.price_per_kilo = Decimal(str(weight_per_kilo))
+        self.price_per_kilo = weight_per_kilo
 
     def calculate_total(self):
-        """Calculate total price based on weight"""
-        self.total_price = (self.weight * self.price_per_kilo).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        """Calculate total price based on weight (rounded down to the cent)"""
+        self.total_price_cents = Money(self.price_per_kilo_cents).multiply(self.weight, ROUND_DOWN).cents
 
     def __str__(self):
         """String representation of weighted vegetable item"""
         return super().__str__() + f"Weight: {self.weight} kg\nPrice per kilo: ${self.price_per_kilo}"
     
 class PackVeggie(Veggie):
+    price_per_pack = MoneyField()
+
     def __init__(self, veg_name: str, num_of_pack: int, price_per_pack: Decimal):
         """Initialize a pack vegetable item
         
@@ -1229,17 +1108,19 @@ class PackVeggie(Veggie):
         """
         super().__init__(veg_name)
         self.num_of_pack = num_of_pack
-        self.price_per_pack = Decimal(str(price_per_pack))
+        self.price_per_pack = price_per_pack
 
     def calculate_total(self):
         """Calculate total price based on number of packs"""
-        self.total_price = (self.num_of_pack * self.price_per_pack).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        self.total_price_cents = self.num_of_pack * self.price_per_pack_cents
 
     def __str__(self):
         """String representation of pack vegetable item"""
         return super().__str__() + f"Number of packs: {self.num_of_pack}\nPrice per pack: ${self.price_per_pack}"
 
 class UnitPriceVeggie(Veggie):
+    price_per_unit = MoneyField()
+
     def __init__(self, veg_name: str, quantity: int, price_per_unit: Decimal):
         """Initialize a unit-priced vegetable item
         
@@ -1250,17 +1131,19 @@ class UnitPriceVeggie(Veggie):
         """
         super().__init__(veg_name)
         self.quantity = quantity
-        self.price_per_unit = Decimal(str(price_per_unit))
+        self.price_per_unit = price_per_unit
     
     def calculate_total(self):
         """Calculate total price based on quantity"""
-        self.total_price = (self.quantity * self.price_per_unit).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        self.total_price_cents = self.quantity * self.price_per_unit_cents
 
     def __str__(self):
         """String representation of unit-priced vegetable item"""
         return super().__str__() + f"Quantity: {self.quantity}\nPrice per unit: ${self.price_per_unit}"
 
 class PremadeBox(Item):
+    price = MoneyField()
+
     def __init__(self, box_size: str, quantity: int, price: Decimal):
         """Initialize a premade box item
         
@@ -1284,7 +1167,7 @@ class PremadeBox(Item):
 
     def calculate_total(self):
         """Calculate total price based on quantity"""
-        self.total_price = (self.quantity * self.price).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        self.total_price_cents = self.quantity * self.price_cents
 
     def __str__(self):
         """String representation of premade box item"""
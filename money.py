@@ -0,0 +1,154 @@
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from functools import total_ordering
+from typing import Tuple, Union
+
+# Anything that can scale an amount: a count, a weight or a rate
+Factor = Union[int, Decimal, str, float]
+
+def _ratio(value: Factor) -> Tuple[int, int]:
+    """Return an exact (numerator, denominator) pair for an int, Decimal or numeric string"""
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, (str, float)):
+        value = Decimal(str(value))
+    if isinstance(value, Decimal):
+        return value.as_integer_ratio()
+    raise TypeError(f"Unsupported money factor: {value!r}")
+
+def _divide(numerator: int, denominator: int, rounding: str) -> int:
+    """Divide two integers (denominator > 0) with a decimal rounding mode
+
+    ROUND_DOWN truncates towards zero and ROUND_HALF_UP rounds halves away
+    from zero, exactly like Decimal.quantize with the same mode.
+    """
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if rounding == ROUND_HALF_UP:
+        if 2 * remainder >= denominator:
+            quotient += 1
+    elif rounding != ROUND_DOWN:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    return quotient if numerator >= 0 else -quotient
+
+
+@total_ordering
+class Money:
+    '''An amount of money held as integer cents.
+
+    Arithmetic between amounts stays on plain ints; scaling by a quantity
+    or rate rounds back to cents with an explicit mode, matching the
+    quantize(Decimal('0.01'), rounding=...) calls it replaces.'''
+    __slots__ = ('cents',)
+
+    def __init__(self, cents: int = 0):
+        """Initialize an amount
+
+        Args:
+            cents (int): Amount in cents
+        """
+        self.cents = cents
+
+    @classmethod
+    def from_decimal(cls, amount: Factor, rounding: str = ROUND_HALF_UP) -> 'Money':
+        """Convert a Decimal (or int/str) amount of dollars to cents
+
+        Args:
+            amount (Decimal): Amount in dollars
+            rounding (str): ROUND_HALF_UP or ROUND_DOWN, used for sub-cent amounts
+        """
+        numerator, denominator = _ratio(amount)
+        return cls(_divide(numerator * 100, denominator, rounding))
+
+    @classmethod
+    def parse(cls, text: str, rounding: str = ROUND_HALF_UP) -> 'Money':
+        """Parse a display string such as '$12.34' or '12.345'"""
+        return cls.from_decimal(Decimal(text.strip().replace('$', '').replace(',', '')), rounding)
+
+    def to_decimal(self) -> Decimal:
+        """Return the amount as a two-decimal Decimal"""
+        return Decimal(self.cents).scaleb(-2)
+
+    def multiply(self, factor: Factor, rounding: str = ROUND_DOWN) -> 'Money':
+        """Scale the amount by a quantity, weight or rate and round back to cents
+
+        Args:
+            factor (Factor): Multiplier, e.g. a unit count, a weight in kg or a discount rate
+            rounding (str): ROUND_DOWN (default) or ROUND_HALF_UP
+        """
+        numerator, denominator = _ratio(factor)
+        return Money(_divide(self.cents * numerator, denominator, rounding))
+
+    def __add__(self, other: 'Money') -> 'Money':
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        if other == 0:  # Allows sum() over amounts
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: 'Money') -> 'Money':
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self) -> 'Money':
+        return Money(-self.cents)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __lt__(self, other: 'Money') -> bool:
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __format__(self, spec: str) -> str:
+        return format(self.to_decimal(), spec)
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self.to_decimal()}')"
+
+
+class MoneyField:
+    '''Descriptor storing an amount as integer cents in "<name>_cents" and
+    exposing it as a two-decimal Decimal under its own name, so existing
+    readers and writers of the Decimal attribute keep working'''
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.cents_name = f"{name}_cents"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return Decimal(instance.__dict__[self.cents_name]).scaleb(-2)
+
+    def __set__(self, instance, value: Factor):
+        instance.__dict__[self.cents_name] = Money.from_decimal(value).cents
+
+
+def upgrade_money_fields(cls: type, state: dict) -> dict:
+    """Convert the Decimal amounts of an older pickled state to the cents attributes
+
+    Args:
+        cls (type): Class whose MoneyField attributes should be converted
+        state (dict): Pickled instance dictionary, updated in place
+
+    Returns:
+        dict: The updated state
+    """
+    for klass in cls.__mro__:
+        for name, field in vars(klass).items():
+            if isinstance(field, MoneyField) and name in state:
+                state[field.cents_name] = Money.from_decimal(state.pop(name)).cents
+    return state
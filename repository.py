@@ -0,0 +1,902 @@
+import bisect
+import copy
+import functools
+import hashlib
+import heapq
+import hmac
+import os
+import pickle
+import threading
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from money import MoneyField
+
+# Default locations of the order store
+ORDERS_FILE = 'data/orders.pkl'
+ORDERS_JOURNAL_FILE = 'data/orders.journal'
+DAILY_SALES_FILE = 'data/daily_sales.pkl'
+PRODUCT_SALES_FILE = 'data/product_sales.pkl'
+
+# Pickle file names of the other stores, relative to the data directory
+CUSTOMER_FILES = {
+    'private': 'private_customers.pkl',
+    'corporate': 'corporate_customers.pkl',
+}
+STAFF_FILE = 'staffs.pkl'
+PAYMENTS_FILE = 'payments.pkl'
+# Username -> (role, id) and password hash of every user, tagged with the user files it was built from
+USER_INDEX_FILE = 'user_index.pkl'
+
+# Format version of the persisted rollups, bumped when their classes change
+ROLLUP_VERSION = 2
+
+# Number of journal records after which the journal is folded into the base file
+SNAPSHOT_THRESHOLD = 200
+
+# PBKDF2-HMAC-SHA256 iterations for new password hashes; ~0.25 s per hash, paid at login and registration
+PASSWORD_ITERATIONS = 600_000
+
+def locked(method):
+    """Run a store method while holding the store's lock
+
+    Views fetch data on worker threads while the Tk thread writes
+    checkouts and fulfilments, so every public store and repository
+    method is serialized on one reentrant lock per store.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def hash_password(password: str, salt: bytes = None,
+                  iterations: int = PASSWORD_ITERATIONS) -> Tuple[int, bytes, bytes]:
+    """Return (iterations, salt, PBKDF2-HMAC-SHA256 digest) of a password
+
+    Args:
+        password (str): The plain text password
+        salt (bytes): Salt to hash with, None for a new random one
+        iterations (int): PBKDF2 work factor, stored with the digest so it can be raised later
+    """
+    if salt is None:
+        salt = os.urandom(16)
+    return iterations, salt, hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+def password_matches(password: str, credentials: Tuple[int, bytes, bytes]) -> bool:
+    """Compare a password with stored (iterations, salt, digest) credentials in constant time"""
+    iterations, salt, expected = credentials
+    return hmac.compare_digest(hash_password(password, salt, iterations)[2], expected)
+
+def file_signature(filename: str) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class SalesTotals:
+    '''Sales figures summed over a set of orders: one instance per day forms
+    the daily rollup, and adding days together gives the totals of a range.
+    Amounts are summed as integer cents and read as Decimals.'''
+    COUNT_FIELDS = ('order_count', 'pickup_count', 'delivery_count',
+                    'private_count', 'corporate_count')
+    AMOUNT_FIELDS = ('subtotal', 'discount', 'delivery_fee', 'sales_amount',
+                     'pickup_sales', 'delivery_sales', 'private_sales', 'corporate_sales')
+    # Integer attributes holding the figures
+    INT_FIELDS = COUNT_FIELDS + tuple(f"{field}_cents" for field in AMOUNT_FIELDS)
+
+    subtotal = MoneyField()
+    discount = MoneyField()
+    delivery_fee = MoneyField()
+    sales_amount = MoneyField()
+    pickup_sales = MoneyField()
+    delivery_sales = MoneyField()
+    private_sales = MoneyField()
+    corporate_sales = MoneyField()
+
+    def __init__(self):
+        """Initialize all counters and amounts to zero"""
+        for field in self.INT_FIELDS:
+            setattr(self, field, 0)
+
+    def add_order(self, order: 'Order', sign: int = 1):
+        """Add an order to the totals, or remove it with sign=-1
+
+        Args:
+            order (Order): The order to count
+            sign (int): 1 to add the order, -1 to remove it
+        """
+        method = order.delivery_method.value  # 'pickup' or 'delivery'
+        kind = order.customer_kind  # 'private' or 'corporate'
+        sales_cents = sign * order.sales_amount_cents
+        self.order_count += sign
+        self.subtotal_cents += sign * order.subtotal_cents
+        self.discount_cents += sign * order.discount_cents
+        self.delivery_fee_cents += sign * order.delivery_fee_cents
+        self.sales_amount_cents += sales_cents
+        for split in (method, kind):
+            setattr(self, f"{split}_count", getattr(self, f"{split}_count") + sign)
+            setattr(self, f"{split}_sales_cents", getattr(self, f"{split}_sales_cents") + sales_cents)
+
+    def merge(self, other: 'SalesTotals'):
+        """Add the figures of another SalesTotals to this one"""
+        for field in self.INT_FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def as_dict(self) -> Dict[str, object]:
+        """Return all figures keyed by field name"""
+        return {field: getattr(self, field) for field in self.COUNT_FIELDS + self.AMOUNT_FIELDS}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SalesTotals) and all(
+            getattr(self, field) == getattr(other, field) for field in self.INT_FIELDS)
+
+class ProductSales:
+    '''Running quantities sold per veggie and per premade box; veggies
+    inside premade boxes count towards the veggie quantities'''
+    def __init__(self):
+        """Initialize empty counters"""
+        self.veggies: Dict[str, Decimal] = {}
+        self.boxes: Dict[str, int] = {}
+
+    @classmethod
+    def from_orders(cls, orders) -> 'ProductSales':
+        """Count the products of an iterable of orders"""
+        product_sales = cls()
+        for order in orders:
+            product_sales.add_order(order)
+        return product_sales
+
+    def add_order(self, order: 'Order', sign: int = 1):
+        """Add the products of an order to the counters, or remove them with sign=-1
+
+        Args:
+            order (Order): The order to count
+            sign (int): 1 to add the order, -1 to remove it
+        """
+        for category, name, quantity in order.product_quantities():
+            self.add(category, name, sign * quantity)
+
+    def add(self, category: str, name: str, quantity):
+        """Add a quantity to one counter, dropping counters that reach zero
+
+        Args:
+            category (str): 'veggie' or 'box'
+            name (str): Product name
+            quantity (Decimal): Quantity to add, negative to subtract
+        """
+        counters = self.boxes if category == 'box' else self.veggies
+        total = counters.get(name, 0) + quantity
+        if total:
+            counters[name] = total
+        else:
+            counters.pop(name, None)
+
+    def top(self, k: int, category: str = 'veggie') -> List[Tuple[str, Decimal]]:
+        """Return the k best-selling products of a category, best first
+
+        Uses a bounded heap, so only k entries are kept while scanning.
+
+        Args:
+            k (int): Number of products to return
+            category (str): 'veggie' or 'box'
+        """
+        counters = self.boxes if category == 'box' else self.veggies
+        return heapq.nlargest(k, counters.items(), key=lambda entry: entry[1])
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, ProductSales)
+                and self.veggies == other.veggies and self.boxes == other.boxes)
+
+class OrderRepository:
+    '''OrderRepository keeps the decoded order dictionary in memory and
+    reloads it only when the files on disk change (mtime or size).
+
+    Orders are stored as a compact base file (orders.pkl) plus an
+    append-only journal. A checkout appends one 'checkout' record (older
+    journals may still hold 'add' records) and a fulfilment appends one
+    'status' record; the journal is replayed on top of the base file when
+    the repository loads, and periodically folded back into the base file
+    by snapshot().
+
+    Records that also touch other stores (customer balances, payments)
+    are passed to the on_record hook, and on_snapshot is called before
+    the journal is cleared so those stores can be written out first.
+
+    Secondary indexes are rebuilt on every reload and kept up to date
+    by _apply, so queries only touch the orders they return. The
+    rollups (daily sales and product quantities) are maintained the same
+    way and saved next to the base file on every snapshot, so a reload
+    only has to replay the journal into them.'''
+    def __init__(self, filename: str = ORDERS_FILE, journal_filename: str = ORDERS_JOURNAL_FILE,
+                 snapshot_threshold: int = SNAPSHOT_THRESHOLD,
+                 daily_sales_filename: str = DAILY_SALES_FILE,
+                 product_sales_filename: str = PRODUCT_SALES_FILE,
+                 lock: threading.RLock = None):
+        """Initialize the repository without touching the files yet
+
+        Args:
+            filename (str): Path of the pickled base order dictionary
+            journal_filename (str): Path of the append-only order journal
+            snapshot_threshold (int): Journal length that triggers a snapshot
+            daily_sales_filename (str): Path of the persisted daily sales rollup
+            product_sales_filename (str): Path of the persisted product quantity counters
+            lock (threading.RLock): Lock shared with the owning store, a new one if None
+        """
+        self.lock = lock or threading.RLock()
+        self.filename = filename
+        self.journal_filename = journal_filename
+        self._daily_sales_file = PickleFile(daily_sales_filename)
+        self._product_sales_file = PickleFile(product_sales_filename)
+        self.snapshot_threshold = snapshot_threshold
+        self._orders = None
+        self._signature = None
+        self._journal_records = 0
+        # Order numbers per OrderStatus, in insertion order (dict used as an ordered set)
+        self._status_index: Dict[object, Dict[str, None]] = {}
+        # Order numbers per customer id, in insertion order
+        self._customer_index: Dict[str, Dict[str, None]] = {}
+        # Order dates kept sorted, with the matching order numbers in a parallel list
+        self._date_keys: List[date] = []
+        self._date_order_numbers: List[str] = []
+        # Daily sales rollup: SalesTotals per order date, with the dates kept sorted
+        self._daily_sales: Dict[date, SalesTotals] = {}
+        self._sales_days: List[date] = []
+        # Quantities sold per product
+        self._product_sales = ProductSales()
+        # Cache counters, exposed through stats()
+        self.hits = 0
+        self.misses = 0
+        # Hooks installed by the owning store
+        self.on_record = None
+        self.on_snapshot = None
+
+    def _store_signature(self):
+        """Return the combined signature of the base file and the journal"""
+        return file_signature(self.filename), file_signature(self.journal_filename)
+
+    @locked
+    def get_orders(self) -> Dict[str, 'Order']:
+        """Return the order dictionary, reloading it only if the files changed
+
+        Returns:
+            Dict[str, Order]: Orders keyed by order number
+        """
+        if self.refresh():
+            self.misses += 1
+        else:
+            self.hits += 1
+        return self._orders
+
+    @locked
+    def refresh(self) -> bool:
+        """Reload the base file and replay the journal if either changed on disk
+
+        Returns:
+            bool: True if the orders were reloaded, False if the cache was valid
+        """
+        signature = self._store_signature()
+        if self._orders is not None and signature == self._signature:
+            return False
+
+        # Decode the base file and replay the journal once
+        if signature[0] is None:
+            self._orders = {}
+        else:
+            with open(self.filename, 'rb') as file:
+                self._orders = pickle.load(file)
+        self._build_indexes()
+        self._load_rollups()
+        self._journal_records = self._replay_journal(self._orders)
+        self._signature = self._store_signature()
+        return True
+
+    @locked
+    def orders_by_status(self, status) -> List['Order']:
+        """Return all orders with the given status
+
+        Args:
+            status (OrderStatus): Status to filter by
+        """
+        orders = self.get_orders()
+        return [orders[order_number] for order_number in self._status_index.get(status, ())]
+
+    @locked
+    def orders_between(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List['Order']:
+        """Return the orders placed between two dates (inclusive), in date order
+
+        Uses binary search on the date index, so the cost is O(log n + k)
+        where k is the number of orders returned.
+
+        Args:
+            start_date (date): First day of the range, None for no lower bound
+            end_date (date): Last day of the range, None for no upper bound
+            offset (int): Number of orders of the range to skip
+            limit (int): Maximum number of orders to return, None for all
+        """
+        orders = self.get_orders()
+        low, high = self._date_bounds(start_date, end_date)
+        low = min(low + offset, high)
+        if limit is not None:
+            high = min(high, low + limit)
+        return [orders[order_number] for order_number in self._date_order_numbers[low:high]]
+
+    @locked
+    def count_between(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Return the number of orders placed between two dates (inclusive)
+
+        Args:
+            start_date (date): First day of the range, None for no lower bound
+            end_date (date): Last day of the range, None for no upper bound
+        """
+        self.get_orders()
+        low, high = self._date_bounds(start_date, end_date)
+        return high - low
+
+    def _date_bounds(self, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+        """Return the slice of the date index covering a date range"""
+        low = 0 if start_date is None else bisect.bisect_left(self._date_keys, start_date)
+        high = (len(self._date_keys) if end_date is None
+                else bisect.bisect_right(self._date_keys, end_date))
+        return low, high
+
+    @locked
+    def sales_totals(self, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None) -> SalesTotals:
+        """Return the summed daily rollups of a date range (inclusive)
+
+        The days of the range are found by binary search on the sorted
+        rollup dates, so only the days inside the range are summed.
+
+        Args:
+            start_date (date): First day of the range, None for no lower bound
+            end_date (date): Last day of the range, None for no upper bound
+        """
+        self.get_orders()
+        low = 0 if start_date is None else bisect.bisect_left(self._sales_days, start_date)
+        high = (len(self._sales_days) if end_date is None
+                else bisect.bisect_right(self._sales_days, end_date))
+        totals = SalesTotals()
+        for day in self._sales_days[low:high]:
+            totals.merge(self._daily_sales[day])
+        return totals
+
+    @locked
+    def product_sales(self, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> ProductSales:
+        """Return the quantities sold per product, over all orders or a date window
+
+        All history comes from a copy of the maintained counters, taken under
+        the lock so checkouts can keep updating them; a window only counts the
+        orders the date index returns for it.
+
+        Args:
+            start_date (date): First day of the window, None for no lower bound
+            end_date (date): Last day of the window, None for no upper bound
+        """
+        if start_date is None and end_date is None:
+            self.get_orders()
+            return copy.deepcopy(self._product_sales)
+        return ProductSales.from_orders(self.orders_between(start_date, end_date))
+
+    @locked
+    def rebuild_rollups(self) -> bool:
+        """Recompute the rollups from every order and persist them with a snapshot
+
+        Returns:
+            bool: True if the maintained rollups already matched the orders
+        """
+        self.get_orders()
+        daily_sales, product_sales = self._daily_sales, self._product_sales
+        self._rebuild_rollups()
+        matched = daily_sales == self._daily_sales and product_sales == self._product_sales
+        self.snapshot()
+        return matched
+
+    @locked
+    def orders_for_customer(self, cust_id: str, status=None) -> List['Order']:
+        """Return the orders placed by a customer
+
+        Args:
+            cust_id (str): Id of the customer
+            status (OrderStatus): Only return orders with this status, all if None
+        """
+        orders = self.get_orders()
+        customer_orders = [orders[order_number]
+                           for order_number in self._customer_index.get(cust_id, ())]
+        if status is None:
+            return customer_orders
+        return [order for order in customer_orders if order.order_status == status]
+
+    @locked
+    def update_status(self, order_number: str, status) -> bool:
+        """Append a status change for an existing order to the journal
+
+        Args:
+            order_number (str): The order to update
+            status (OrderStatus): The new status
+
+        Returns:
+            bool: True if the order exists, False otherwise
+        """
+        if order_number not in self.get_orders():
+            return False
+        self.append_record(('status', order_number, status))
+        return True
+
+    @locked
+    def snapshot(self):
+        """Fold the journal into a compact base file and empty the journal"""
+        orders = self.get_orders()
+        if self.on_snapshot:
+            self.on_snapshot()
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as file:
+            pickle.dump(orders, file)
+            file.flush()
+            os.fsync(file.fileno())
+        # The base file is replaced atomically before the journal is cleared;
+        # replaying a journal that is already folded in is harmless
+        os.replace(temp_filename, self.filename)
+        self._save_rollups()
+        with open(self.journal_filename, 'wb'):
+            pass
+        self._journal_records = 0
+        self._signature = self._store_signature()
+
+    @locked
+    def stats(self) -> Dict[str, int]:
+        """Return cache hit/miss counters and the current journal length"""
+        return {"hits": self.hits, "misses": self.misses, "journal_records": self._journal_records}
+
+    @locked
+    def append_record(self, record: tuple):
+        """Durably append one record to the journal and apply it in memory
+
+        Args:
+            record (tuple): Journal record, starting with its type
+        """
+        self.refresh()
+        orders = self._orders
+        with open(self.journal_filename, 'ab') as file:
+            pickle.dump(record, file)
+            file.flush()
+            os.fsync(file.fileno())
+        self._apply(orders, record)
+        self._journal_records += 1
+        self._signature = self._store_signature()
+
+        if self._journal_records >= self.snapshot_threshold:
+            self.snapshot()
+
+    def _replay_journal(self, orders: Dict[str, 'Order']) -> int:
+        """Apply all journal records to the order dictionary
+
+        A record cut short by a crash is dropped and the journal is
+        truncated back to the last complete record. Any other error, such
+        as a complete record naming a class that no longer exists, is
+        raised and leaves the journal untouched.
+
+        Returns:
+            int: Number of records replayed
+        """
+        count = 0
+        try:
+            file = open(self.journal_filename, 'r+b')
+        except FileNotFoundError:
+            return count
+
+        with file:
+            good_offset = 0
+            while True:
+                try:
+                    record = pickle.load(file)
+                except (EOFError, pickle.UnpicklingError):
+                    # Only a torn write at the end of the file looks like this
+                    break
+                self._apply(orders, record)
+                good_offset = file.tell()
+                count += 1
+
+            # Anything after the last complete record is a torn write
+            if file.seek(0, os.SEEK_END) != good_offset:
+                print(f"Dropping incomplete record from {self.journal_filename}")
+                file.truncate(good_offset)
+        return count
+
+    def _build_indexes(self):
+        """Rebuild the secondary indexes from the current order dictionary"""
+        self._status_index = {}
+        self._customer_index = {}
+        for order in self._orders.values():
+            self._status_index.setdefault(order.order_status, {})[order.order_number] = None
+            self._customer_index.setdefault(order.cust_id, {})[order.order_number] = None
+        by_date = sorted(self._orders.values(), key=lambda order: order.order_date)
+        self._date_keys = [order.order_date for order in by_date]
+        self._date_order_numbers = [order.order_number for order in by_date]
+
+    def _rebuild_rollups(self):
+        """Recompute the daily sales and product rollups from the current order dictionary"""
+        self._daily_sales = {}
+        self._product_sales = ProductSales()
+        for order in self._orders.values():
+            self._daily_sales.setdefault(order.order_date, SalesTotals()).add_order(order)
+            self._product_sales.add_order(order)
+        self._sales_days = sorted(self._daily_sales)
+
+    def _load_rollups(self):
+        """Use the persisted rollups if they match the base file, otherwise rebuild them"""
+        base_signature = file_signature(self.filename)
+        daily = self._daily_sales_file.load()
+        products = self._product_sales_file.load()
+        if all(saved.get('base_signature') == base_signature
+               and saved.get('version') == ROLLUP_VERSION for saved in (daily, products)):
+            # Copied, the cached file contents must not see later journal records
+            self._daily_sales = {day: copy.copy(totals) for day, totals in daily['days'].items()}
+            self._sales_days = sorted(self._daily_sales)
+            self._product_sales = copy.deepcopy(products['products'])
+        else:
+            self._rebuild_rollups()
+
+    def _save_rollups(self):
+        """Write the rollups, tagged with the signature of the base file they match"""
+        base_signature = file_signature(self.filename)
+        # Copied, PickleFile caches what it saves and later journal records must not reach it
+        days = {day: copy.copy(totals) for day, totals in self._daily_sales.items()}
+        self._daily_sales_file.save({'base_signature': base_signature, 'version': ROLLUP_VERSION,
+                                     'days': days})
+        self._product_sales_file.save({'base_signature': base_signature, 'version': ROLLUP_VERSION,
+                                       'products': copy.deepcopy(self._product_sales)})
+
+    def _index_order(self, order: 'Order'):
+        """Add an order to the secondary indexes"""
+        self._status_index.setdefault(order.order_status, {})[order.order_number] = None
+        self._customer_index.setdefault(order.cust_id, {})[order.order_number] = None
+        position = bisect.bisect_right(self._date_keys, order.order_date)
+        self._date_keys.insert(position, order.order_date)
+        self._date_order_numbers.insert(position, order.order_number)
+        if order.order_date not in self._daily_sales:
+            self._daily_sales[order.order_date] = SalesTotals()
+            bisect.insort(self._sales_days, order.order_date)
+        self._daily_sales[order.order_date].add_order(order)
+        self._product_sales.add_order(order)
+
+    def _unindex_order(self, order: 'Order'):
+        """Remove an order from the secondary indexes"""
+        self._status_index.get(order.order_status, {}).pop(order.order_number, None)
+        self._customer_index.get(order.cust_id, {}).pop(order.order_number, None)
+        low = bisect.bisect_left(self._date_keys, order.order_date)
+        high = bisect.bisect_right(self._date_keys, order.order_date)
+        for position in range(low, high):
+            if self._date_order_numbers[position] == order.order_number:
+                del self._date_keys[position]
+                del self._date_order_numbers[position]
+                break
+        day_totals = self._daily_sales.get(order.order_date)
+        if day_totals is not None:
+            day_totals.add_order(order, sign=-1)
+            if not day_totals.order_count:
+                del self._daily_sales[order.order_date]
+                del self._sales_days[bisect.bisect_left(self._sales_days, order.order_date)]
+        self._product_sales.add_order(order, sign=-1)
+
+    def _apply(self, orders: Dict[str, 'Order'], record: tuple):
+        """Apply a single journal record to the order dictionary and its indexes"""
+        kind = record[0]
+        if kind in ('add', 'checkout'):
+            order = record[1]
+            # An order number can be reused, drop the replaced order from the indexes
+            previous = orders.get(order.order_number)
+            if previous is not None:
+                self._unindex_order(previous)
+            orders[order.order_number] = order
+            self._index_order(order)
+        elif kind == 'status':
+            _, order_number, status = record
+            order = orders.get(order_number)
+            if order:
+                # Only the status index depends on the status
+                self._status_index.get(order.order_status, {}).pop(order_number, None)
+                order.order_status = status
+                self._status_index.setdefault(status, {})[order_number] = None
+
+        if self.on_record:
+            self.on_record(record)
+
+
+class PickleFile:
+    '''A pickled dictionary kept in memory and reloaded only when the file changes'''
+    def __init__(self, filename: str):
+        """Initialize the cache without reading the file
+
+        Args:
+            filename (str): Path of the pickle file
+        """
+        self.filename = filename
+        self._data = None
+        self._signature = None
+
+    def load(self) -> dict:
+        """Return the decoded dictionary, an empty one if the file doesn't exist"""
+        signature = file_signature(self.filename)
+        if self._data is None or signature != self._signature:
+            if signature is None:
+                self._data = {}
+            else:
+                with open(self.filename, 'rb') as file:
+                    self._data = pickle.load(file)
+            self._signature = signature
+        return self._data
+
+    def save(self, data: dict):
+        """Atomically replace the file with the given dictionary"""
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as file:
+            pickle.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.filename)
+        self._data = data
+        self._signature = file_signature(self.filename)
+
+
+class PickleStore:
+    '''Default storage backend built on the data/*.pkl files.
+
+    All writes go through the order journal: customer and payment
+    updates are journal records too, so a checkout commits the order,
+    the new balance and the payment with one append. The order
+    repository folds the journal into the pickle files when it takes a
+    snapshot.'''
+    def __init__(self, data_dir: str = 'data'):
+        """Initialize the store for a data directory
+
+        Args:
+            data_dir (str): Directory containing the pickle files
+        """
+        self.data_dir = data_dir
+        # Serializes the store and its repository across the Tk thread and worker threads
+        self.lock = threading.RLock()
+        self.orders = OrderRepository(os.path.join(data_dir, 'orders.pkl'),
+                                      os.path.join(data_dir, 'orders.journal'),
+                                      daily_sales_filename=os.path.join(data_dir, 'daily_sales.pkl'),
+                                      product_sales_filename=os.path.join(data_dir, 'product_sales.pkl'),
+                                      lock=self.lock)
+        self._customers = {kind: PickleFile(os.path.join(data_dir, filename))
+                           for kind, filename in CUSTOMER_FILES.items()}
+        self._staff = PickleFile(os.path.join(data_dir, STAFF_FILE))
+        self._payments = PickleFile(os.path.join(data_dir, PAYMENTS_FILE))
+        self._user_index_filename = os.path.join(data_dir, USER_INDEX_FILE)
+        self._user_index: Optional[Dict[str, Tuple[str, str]]] = None
+        self._credentials: Optional[Dict[str, Tuple[int, bytes, bytes]]] = None  # Username -> (iterations, salt, digest)
+        self.orders.on_record = self._apply_record
+        self.orders.on_snapshot = self._save_files
+
+    @locked
+    def load_customers(self, kind: str) -> Dict[str, 'Customer']:
+        """Return all customers of a kind ('private' or 'corporate') keyed by id
+
+        The dictionary is a copy, so callers can iterate it while other threads
+        add or update customers.
+        """
+        customers = self._customers[kind].load()
+        # Journaled balance changes are applied when the journal is replayed
+        self.orders.refresh()
+        return dict(customers)
+
+    @locked
+    def get_customer(self, kind: str, cust_id: str) -> Optional['Customer']:
+        """Return a single customer or None if it doesn't exist, without copying the others"""
+        self.orders.refresh()
+        return self._customers[kind].load().get(cust_id)
+
+    @locked
+    def save_customer(self, kind: str, customer: 'Customer'):
+        """Insert or replace a customer, keeping its index entry and password hash current"""
+        previous = self.get_customer(kind, customer.cust_id)
+        self.orders.append_record(('customer', kind, customer))
+        if self._user_index is None:
+            return
+        changed = False
+        if self._user_index.get(customer.username) != (kind, customer.cust_id):
+            self._user_index[customer.username] = (kind, customer.cust_id)
+            changed = True
+        # Hashing is slow on purpose, so balance updates don't rehash an unchanged password
+        if (customer.username not in self._credentials or previous is None
+                or previous.password != customer.password):
+            self._credentials[customer.username] = hash_password(customer.password)
+            changed = True
+        if changed:
+            self._save_user_index()
+
+    @locked
+    def load_staff(self) -> Dict[str, 'Staff']:
+        """Return all staff members keyed by staff id"""
+        return self._staff.load()
+
+    @locked
+    def get_staff(self, staff_id: str) -> Optional['Staff']:
+        """Return a single staff member or None if it doesn't exist"""
+        return self.load_staff().get(staff_id)
+
+    @locked
+    def user_index(self, rebuild: bool = False) -> Dict[str, Tuple[str, str]]:
+        """Return username -> (role, id) for all staff, private and corporate users
+
+        The index is read from its own small pickle while the user files it
+        was built from are unchanged, so logging in doesn't need every
+        customer unpickled. Otherwise (or with rebuild=True) it is rebuilt
+        from the user files and the journal, and saved again. The password
+        hashes returned by user_credentials are kept with it; a rebuild only
+        hashes users without a hash made with PASSWORD_ITERATIONS.
+
+        Args:
+            rebuild (bool): Ignore the saved index, e.g. when a username is missing from it
+
+        Returns:
+            Dict[str, Tuple[str, str]]: Username -> (role, id), role being 'staff', 'private' or 'corporate'
+        """
+        saved_credentials = {}
+        if self._user_index is None:
+            try:
+                with open(self._user_index_filename, 'rb') as file:
+                    data = pickle.load(file)
+                saved_credentials = data.get('password_hashes', {})
+                if not rebuild and data.get('signatures') == self._user_file_signatures() \
+                        and 'password_hashes' in data:
+                    self._user_index = data['users']
+                    self._credentials = saved_credentials
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Rebuilding user index: {str(e)}")
+        if self._user_index is None or rebuild:
+            # Passwords only change through save_customer, which rehashes them, so current hashes are kept
+            previous = self._credentials if self._credentials is not None else saved_credentials
+            users, credentials = {}, {}
+            for role in ('staff', 'private', 'corporate'):
+                records = self.load_staff() if role == 'staff' else self.load_customers(role)
+                for user_id, user in records.items():
+                    users[user.username] = (role, user_id)
+                    stored = previous.get(user.username)
+                    if stored is None or stored[0] != PASSWORD_ITERATIONS:
+                        stored = hash_password(user.password)
+                    credentials[user.username] = stored
+            self._user_index = users
+            self._credentials = credentials
+            self._save_user_index()
+        return self._user_index
+
+    @locked
+    def user_credentials(self, username: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """Return the (iterations, salt, password hash) of a username, or None if it isn't indexed"""
+        self.user_index()
+        return self._credentials.get(username)
+
+    def _user_file_signatures(self) -> list:
+        """Signatures of the staff and customer pickles the user index depends on"""
+        return [file_signature(user_file.filename)
+                for user_file in (self._staff, *self._customers.values())]
+
+    def _save_user_index(self):
+        """Atomically write the user index with the current user file signatures"""
+        temp_filename = self._user_index_filename + '.tmp'
+        try:
+            with open(temp_filename, 'wb') as file:
+                pickle.dump({'signatures': self._user_file_signatures(), 'users': self._user_index,
+                             'password_hashes': self._credentials}, file)
+            os.replace(temp_filename, self._user_index_filename)
+        except OSError as e:
+            print(f"Error saving user index: {str(e)}")
+
+    @locked
+    def load_payments(self) -> Dict[str, 'Payment']:
+        """Return all payments keyed by payment id"""
+        payments = self._payments.load()
+        self.orders.refresh()
+        return payments
+
+    @locked
+    def add_payment(self, payment: 'Payment'):
+        """Store a new payment record"""
+        self.orders.append_record(('payment', payment))
+
+    @locked
+    def check_out(self, kind: str, customer: 'Customer', order: 'Order',
+                  payment: 'Payment' = None, charge_to_account: bool = False) -> bool:
+        """Validate and commit a checkout as a single journal record
+
+        Reads the customer store at most once (it is cached), checks the
+        credit limit for account payments, then appends the order, the
+        customer with its new balance and the payment in one durable write.
+
+        Args:
+            kind (str): Customer kind ('private' or 'corporate')
+            customer (Customer): The customer placing the order
+            order (Order): The new order
+            payment (Payment): Card payment record, None for account payments
+            charge_to_account (bool): Add the order total to the customer balance
+
+        Returns:
+            bool: True if committed, False if the customer is unknown or over the limit
+        """
+        stored = self.get_customer(kind, customer.cust_id)
+        if stored is None:
+            return False
+
+        previous_balance = customer.cust_balance
+        if charge_to_account:
+            new_balance = stored.cust_balance + order.total_amount
+            if new_balance > stored.max_owing:
+                return False
+            customer.cust_balance = new_balance
+
+        try:
+            self.orders.append_record(('checkout', order, kind, customer, payment))
+        except Exception:
+            customer.cust_balance = previous_balance
+            raise
+        return True
+
+    def _apply_record(self, record: tuple):
+        """Apply the customer and payment parts of a journal record"""
+        kind = record[0]
+        if kind == 'checkout':
+            _, _, cust_kind, customer, payment = record
+            self._customers[cust_kind].load()[customer.cust_id] = customer
+            if payment:
+                self._payments.load()[payment.payment_id] = payment
+        elif kind == 'customer':
+            _, cust_kind, customer = record
+            self._customers[cust_kind].load()[customer.cust_id] = customer
+        elif kind == 'payment':
+            payment = record[1]
+            self._payments.load()[payment.payment_id] = payment
+
+    def _save_files(self):
+        """Write the customer and payment pickles before the journal is cleared"""
+        for customer_file in self._customers.values():
+            customer_file.save(customer_file.load())
+        self._payments.save(self._payments.load())
+        # The customer files changed, so re-tag the user index with their new signatures
+        if self._user_index is not None:
+            self._save_user_index()
+
+
+def open_store(backend: str = 'pickle', data_dir: str = 'data'):
+    """Create the storage backend used by the application
+
+    Args:
+        backend (str): 'pickle' for the data/*.pkl files or 'sqlite' for data/fhv.db
+        data_dir (str): Directory containing the data files
+
+    Returns:
+        PickleStore or SQLiteStore: The opened store
+    """
+    if backend == 'sqlite':
+        # Imported lazily so the default backend never loads sqlite3
+        from sqlite_store import SQLiteStore
+        return SQLiteStore(os.path.join(data_dir, 'fhv.db'))
+    if backend != 'pickle':
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return PickleStore(data_dir)
+
+
+def rebuild_rollups_job(store) -> int:
+    """Recompute the sales and product rollups of a store and report whether they were current
+
+    Args:
+        store (PickleStore or SQLiteStore): The opened store
+
+    Returns:
+        int: Process exit code
+    """
+    if store.orders.rebuild_rollups():
+        print("Rollups matched the orders")
+    else:
+        print("Rollups were out of date and have been rebuilt")
+    return 0
@@ -1,9 +1,80 @@
 # This file is the entry point of the program. It creates a Company object and a Login object and runs the login screen.
-from view.login import Login
+# With --headless it runs a maintenance or report job instead, without importing tkinter or the views.
+import argparse
+import sys
+from datetime import date
 from controller import Company
 
+def run_headless(argv):
+    """Run a scripted job: python run.py --headless [--backend sqlite] [--data-dir data] {report,migrate,rebuild-rollups,analytics} ...
+
+    Args:
+        argv (list): Command line arguments after --headless
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="run.py --headless", description="Run a job without the GUI")
+    parser.add_argument("--backend", default=None, choices=["pickle", "sqlite"],
+                        help="storage backend (default: FHV_STORAGE or pickle)")
+    parser.add_argument("--data-dir", default="data", help="directory containing the data files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="print the sales report of a date range")
+    report.add_argument("--start", type=date.fromisoformat, default=None, help="first day (YYYY-MM-DD)")
+    report.add_argument("--end", type=date.fromisoformat, default=None, help="last day (YYYY-MM-DD)")
+    report.add_argument("--staff", default=None, help="staff username to run the report as (default: first staff)")
+
+    migrate = commands.add_parser("migrate", help="import the data/*.pkl stores into SQLite")
+    migrate.add_argument("--database", default=None, help="SQLite file to create (default: <data-dir>/fhv.db)")
+
+    commands.add_parser("rebuild-rollups", help="recompute the sales and product rollups from all orders")
+
+    analytics = commands.add_parser("analytics", help="group sales totals with the NumPy engine")
+    analytics.add_argument("--start", type=date.fromisoformat, default=None, help="first day (YYYY-MM-DD)")
+    analytics.add_argument("--end", type=date.fromisoformat, default=None, help="last day (YYYY-MM-DD)")
+    analytics.add_argument("--by", default="day,customer_kind,delivery_method",
+                           help="comma separated group keys: day, status, customer_kind, delivery_method")
+    args = parser.parse_args(argv)
+
+    # Each job's module is imported in its own branch, so no job pays for NumPy or SQLite it doesn't use
+    if args.command == "migrate":
+        # Reads the pickle files directly, no Company needed
+        from sqlite_store import migrate_job
+        return migrate_job(args.data_dir, args.database)
+
+    company = Company(args.backend, args.data_dir)
+
+    if args.command == "report":
+        staff = None
+        if args.staff:
+            staff = company.get_user(args.staff, "staff")
+        else:
+            for username, (role, user_id) in company.user_index.items():
+                if role == "staff":
+                    staff = company.get_user(username, "staff")
+                    break
+        if staff is None:
+            print("No such staff member", file=sys.stderr)
+            return 1
+        for line in staff.iter_sales_report(args.start, args.end):
+            print(line)
+    elif args.command == "rebuild-rollups":
+        from repository import rebuild_rollups_job
+        return rebuild_rollups_job(company.store)
+    elif args.command == "analytics":
+        from analytics import analytics_job
+        return analytics_job(company.store, args.start, args.end, args.by)
+    return 0
+
 if __name__ == "__main__":
     '''Entry point of the program'''
+    if len(sys.argv) > 1 and sys.argv[1] == "--headless":
+        sys.exit(run_headless(sys.argv[2:]))
+
+    # The GUI is only imported here, so headless jobs never load tkinter
+    from view.login import Login
     company = Company()
+    company.catalog_watcher  # Fail at startup if the catalog files are missing
     login = Login(company)
-    login.run()
\ No newline at end of file
+    login.run()
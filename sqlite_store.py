@@ -0,0 +1,539 @@
+import os
+import pickle
+import sqlite3
+import threading
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from model import OrderStatus
+from repository import (CUSTOMER_FILES, PASSWORD_ITERATIONS, PickleStore, ProductSales, SalesTotals,
+                        hash_password, locked)
+
+# Default location of the SQLite database
+DATABASE_FILE = 'data/fhv.db'
+
+# Objects are stored as pickled blobs; the columns next to them hold the
+# values the application filters on, so those lookups use the indexes
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_number TEXT PRIMARY KEY,
+    cust_id TEXT NOT NULL,
+    order_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+CREATE INDEX IF NOT EXISTS idx_orders_cust_id ON orders (cust_id);
+CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders (order_date);
+
+CREATE TABLE IF NOT EXISTS customers (
+    cust_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    username TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_customers_kind ON customers (kind);
+
+CREATE TABLE IF NOT EXISTS staff (
+    staff_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+
+-- PBKDF2 password hashes with their parameters, so logins never read the user rows
+CREATE TABLE IF NOT EXISTS credentials (
+    username TEXT PRIMARY KEY,
+    iterations INTEGER NOT NULL,
+    salt BLOB NOT NULL,
+    digest BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id TEXT PRIMARY KEY,
+    payment_date TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS daily_sales (
+    sales_date TEXT PRIMARY KEY,
+    order_count INTEGER NOT NULL,
+    pickup_count INTEGER NOT NULL,
+    delivery_count INTEGER NOT NULL,
+    private_count INTEGER NOT NULL,
+    corporate_count INTEGER NOT NULL,
+    subtotal_cents INTEGER NOT NULL,
+    discount_cents INTEGER NOT NULL,
+    delivery_fee_cents INTEGER NOT NULL,
+    sales_amount_cents INTEGER NOT NULL,
+    pickup_sales_cents INTEGER NOT NULL,
+    delivery_sales_cents INTEGER NOT NULL,
+    private_sales_cents INTEGER NOT NULL,
+    corporate_sales_cents INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS product_sales (
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    PRIMARY KEY (category, name)
+);
+"""
+
+# daily_sales columns, the integer fields of SalesTotals (amounts in cents)
+DAILY_SALES_COLUMNS = list(SalesTotals.INT_FIELDS)
+
+class SQLiteOrderRepository:
+    '''Order repository backed by the orders table, with the same interface
+    as repository.OrderRepository'''
+    def __init__(self, connection: sqlite3.Connection, lock: threading.RLock = None):
+        """Initialize the repository on an open connection
+
+        Args:
+            connection (sqlite3.Connection): Connection of the owning SQLiteStore
+            lock (threading.RLock): Lock shared with the owning store, a new one if None
+        """
+        self.lock = lock or threading.RLock()
+        self.connection = connection
+        self.queries = 0
+
+    def _load_rows(self, sql: str, params: tuple = ()) -> List['Order']:
+        """Run a query returning (status, data) rows and decode the orders"""
+        self.queries += 1
+        orders = []
+        for status, data in self.connection.execute(sql, params):
+            order = pickle.loads(data)
+            # The status column is authoritative, the blob is not rewritten on fulfilment
+            order.order_status = OrderStatus(status)
+            orders.append(order)
+        return orders
+
+    @locked
+    def get_orders(self) -> Dict[str, 'Order']:
+        """Return all orders keyed by order number"""
+        orders = self._load_rows("SELECT status, data FROM orders ORDER BY rowid")
+        return {order.order_number: order for order in orders}
+
+    @locked
+    def orders_by_status(self, status) -> List['Order']:
+        """Return all orders with the given status (uses idx_orders_status)"""
+        return self._load_rows("SELECT status, data FROM orders WHERE status = ? ORDER BY rowid",
+                               (status.value,))
+
+    @locked
+    def orders_between(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List['Order']:
+        """Return the orders placed between two dates inclusive, in date order; a
+        None bound leaves that end of the range open (uses idx_orders_order_date).
+        offset and limit page through the range, so only the rows of the page
+        are decoded."""
+        condition, params = date_range_condition("order_date", start_date, end_date)
+        sql = f"SELECT status, data FROM orders WHERE {condition} ORDER BY order_date, rowid"
+        if offset or limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += (-1 if limit is None else limit, offset)
+        return self._load_rows(sql, params)
+
+    @locked
+    def count_between(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Return the number of orders placed between two dates inclusive (uses idx_orders_order_date)"""
+        condition, params = date_range_condition("order_date", start_date, end_date)
+        self.queries += 1
+        return self.connection.execute(f"SELECT count(*) FROM orders WHERE {condition}", params).fetchone()[0]
+
+    @locked
+    def orders_for_customer(self, cust_id: str, status=None) -> List['Order']:
+        """Return the orders placed by a customer, optionally with one status (uses idx_orders_cust_id)"""
+        if status is None:
+            return self._load_rows("SELECT status, data FROM orders WHERE cust_id = ? ORDER BY rowid",
+                                   (cust_id,))
+        return self._load_rows(
+            "SELECT status, data FROM orders WHERE cust_id = ? AND status = ? ORDER BY rowid",
+            (cust_id, status.value)
+        )
+
+    @locked
+    def sales_totals(self, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None) -> SalesTotals:
+        """Return the summed daily_sales rows of a date range (inclusive)"""
+        condition, params = date_range_condition("sales_date", start_date, end_date)
+        self.queries += 1
+        sums = ", ".join(f"coalesce(sum({column}), 0)" for column in DAILY_SALES_COLUMNS)
+        row = self.connection.execute(
+            f"SELECT {sums} FROM daily_sales WHERE {condition}", params
+        ).fetchone()
+        return sales_totals_from_row(row)
+
+    @locked
+    def product_sales(self, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> ProductSales:
+        """Return the quantities sold per product, from the product_sales table
+        for all history or from the orders of a date window"""
+        if start_date is not None or end_date is not None:
+            return ProductSales.from_orders(self.orders_between(start_date, end_date))
+        self.queries += 1
+        product_sales = ProductSales()
+        for category, name, quantity in self.connection.execute(
+                "SELECT category, name, quantity FROM product_sales"):
+            product_sales.add(category, name, Decimal(quantity) if category == 'veggie' else int(quantity))
+        return product_sales
+
+    @locked
+    def rebuild_rollups(self) -> bool:
+        """Recompute daily_sales and product_sales from every order in one transaction
+
+        Returns:
+            bool: True if the maintained tables already matched the orders
+        """
+        orders = self.get_orders().values()
+        expected_days, expected_products = {}, ProductSales.from_orders(orders)
+        for order in orders:
+            expected_days.setdefault(order.order_date, SalesTotals()).add_order(order)
+
+        rows = self.connection.execute(
+            f"SELECT sales_date, {', '.join(DAILY_SALES_COLUMNS)} FROM daily_sales WHERE order_count != 0"
+        )
+        days = {date.fromisoformat(row[0]): sales_totals_from_row(row[1:]) for row in rows}
+        matched = days == expected_days and self.product_sales() == expected_products
+
+        with self.connection:
+            self.connection.execute("DELETE FROM daily_sales")
+            self.connection.execute("DELETE FROM product_sales")
+            for order in orders:
+                update_daily_sales(self.connection, order)
+                update_product_sales(self.connection, order)
+        return matched
+
+    @locked
+    def update_status(self, order_number: str, status) -> bool:
+        """Change the status of an existing order
+
+        Returns:
+            bool: True if the order exists, False otherwise
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE orders SET status = ? WHERE order_number = ?", (status.value, order_number)
+            )
+        return cursor.rowcount > 0
+
+    @locked
+    def stats(self) -> Dict[str, int]:
+        """Return the number of queries issued"""
+        return {"queries": self.queries}
+
+
+def date_range_condition(column: str, start_date: Optional[date],
+                         end_date: Optional[date]) -> Tuple[str, tuple]:
+    """Return a WHERE condition and its parameters limiting a date column to a range (inclusive)"""
+    conditions, params = ["1"], []
+    if start_date is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(start_date.isoformat())
+    if end_date is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(end_date.isoformat())
+    return ' AND '.join(conditions), tuple(params)
+
+def sales_totals_from_row(row: tuple) -> SalesTotals:
+    """Build a SalesTotals from daily_sales values in DAILY_SALES_COLUMNS order"""
+    totals = SalesTotals()
+    for field, value in zip(SalesTotals.INT_FIELDS, row):
+        setattr(totals, field, value)
+    return totals
+
+def update_daily_sales(connection: sqlite3.Connection, order: 'Order', sign: int = 1):
+    """Add an order to its daily_sales row, or remove it with sign=-1"""
+    totals = SalesTotals()
+    totals.add_order(order, sign)
+    values = [getattr(totals, field) for field in SalesTotals.INT_FIELDS]
+    connection.execute(
+        f"INSERT INTO daily_sales (sales_date, {', '.join(DAILY_SALES_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' for _ in DAILY_SALES_COLUMNS)}) "
+        f"ON CONFLICT (sales_date) DO UPDATE SET "
+        + ", ".join(f"{column} = {column} + excluded.{column}" for column in DAILY_SALES_COLUMNS),
+        [order.order_date.isoformat()] + values
+    )
+
+def update_product_sales(connection: sqlite3.Connection, order: 'Order', sign: int = 1):
+    """Add the products of an order to product_sales, or remove them with sign=-1"""
+    for category, name, quantity in order.product_quantities():
+        row = connection.execute(
+            "SELECT quantity FROM product_sales WHERE category = ? AND name = ?", (category, name)
+        ).fetchone()
+        total = (Decimal(row[0]) if row else 0) + sign * quantity
+        if total:
+            connection.execute(
+                "INSERT OR REPLACE INTO product_sales (category, name, quantity) VALUES (?, ?, ?)",
+                (category, name, str(total))
+            )
+        else:
+            connection.execute(
+                "DELETE FROM product_sales WHERE category = ? AND name = ?", (category, name)
+            )
+
+def insert_order(connection: sqlite3.Connection, order: 'Order'):
+    """Insert or replace an order row and keep the rollup tables in step (caller manages the transaction)"""
+    previous = connection.execute(
+        "SELECT data FROM orders WHERE order_number = ?", (order.order_number,)
+    ).fetchone()
+    if previous:
+        previous_order = pickle.loads(previous[0])
+        update_daily_sales(connection, previous_order, sign=-1)
+        update_product_sales(connection, previous_order, sign=-1)
+    update_daily_sales(connection, order)
+    update_product_sales(connection, order)
+    connection.execute(
+        "INSERT OR REPLACE INTO orders (order_number, cust_id, order_date, status, data) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (order.order_number, order.cust_id, order.order_date.isoformat(),
+         order.order_status.value, pickle.dumps(order))
+    )
+
+def insert_customer(connection: sqlite3.Connection, kind: str, customer: 'Customer'):
+    """Insert or replace a customer row (caller manages the transaction)"""
+    connection.execute(
+        "INSERT OR REPLACE INTO customers (cust_id, kind, username, data) VALUES (?, ?, ?, ?)",
+        (customer.cust_id, kind, customer.username, pickle.dumps(customer))
+    )
+
+def insert_staff(connection: sqlite3.Connection, staff: 'Staff'):
+    """Insert or replace a staff row (caller manages the transaction)"""
+    connection.execute(
+        "INSERT OR REPLACE INTO staff (staff_id, username, data) VALUES (?, ?, ?)",
+        (staff.staff_ID, staff.username, pickle.dumps(staff))
+    )
+
+def insert_credentials(connection: sqlite3.Connection, username: str, password: str):
+    """Insert or replace the password hash of a username (caller manages the transaction)"""
+    connection.execute(
+        "INSERT OR REPLACE INTO credentials (username, iterations, salt, digest) VALUES (?, ?, ?, ?)",
+        (username, *hash_password(password))
+    )
+
+def insert_payment(connection: sqlite3.Connection, payment: 'Payment'):
+    """Insert or replace a payment row (caller manages the transaction)"""
+    connection.execute(
+        "INSERT OR REPLACE INTO payments (payment_id, payment_date, data) VALUES (?, ?, ?)",
+        (payment.payment_id, payment.payment_date.isoformat(), pickle.dumps(payment))
+    )
+
+
+class SQLiteStore:
+    '''Optional storage backend keeping all data in a local SQLite file,
+    with the same interface as repository.PickleStore'''
+    def __init__(self, filename: str = DATABASE_FILE):
+        """Open (and create if needed) the database
+
+        Args:
+            filename (str): Path of the SQLite database file
+        """
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        # A credentials table from before the iterations column held single SHA-256 rounds; user_index rehashes
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(credentials)")]
+        if 'iterations' not in columns:
+            self.connection.executescript("DROP TABLE credentials;" + SCHEMA)
+        # One connection is shared by the Tk thread and worker threads, one transaction at a time
+        self.lock = threading.RLock()
+        self.orders = SQLiteOrderRepository(self.connection, self.lock)
+        # Identity map: one Customer object per (kind, cust_id), refreshed in place
+        self._customers = {}
+        self._user_index: Optional[Dict[str, Tuple[str, str]]] = None
+
+    def _hydrate_customer(self, kind: str, data: bytes) -> 'Customer':
+        """Decode a customer row through the identity map"""
+        customer = pickle.loads(data)
+        existing = self._customers.get((kind, customer.cust_id))
+        if existing is None:
+            self._customers[(kind, customer.cust_id)] = customer
+            return customer
+        existing.__dict__.update(customer.__dict__)
+        return existing
+
+    @locked
+    def load_customers(self, kind: str) -> Dict[str, 'Customer']:
+        """Return all customers of a kind ('private' or 'corporate') keyed by id"""
+        rows = self.connection.execute(
+            "SELECT cust_id, data FROM customers WHERE kind = ? ORDER BY cust_id", (kind,)
+        )
+        return {cust_id: self._hydrate_customer(kind, data) for cust_id, data in rows}
+
+    @locked
+    def get_customer(self, kind: str, cust_id: str) -> Optional['Customer']:
+        """Return a single customer or None if it doesn't exist (primary key lookup)"""
+        row = self.connection.execute(
+            "SELECT data FROM customers WHERE cust_id = ? AND kind = ?", (cust_id, kind)
+        ).fetchone()
+        return self._hydrate_customer(kind, row[0]) if row else None
+
+    @locked
+    def save_customer(self, kind: str, customer: 'Customer'):
+        """Insert or replace a customer, keeping its password hash current"""
+        # Decoded directly, not through the identity map, which would overwrite the unsaved changes
+        row = self.connection.execute(
+            "SELECT data FROM customers WHERE cust_id = ? AND kind = ?", (customer.cust_id, kind)
+        ).fetchone()
+        previous_password = pickle.loads(row[0]).password if row else None
+        with self.connection:
+            insert_customer(self.connection, kind, customer)
+            # Hashing is slow on purpose, so balance updates don't rehash an unchanged password
+            if self.user_credentials(customer.username) is None or previous_password != customer.password:
+                insert_credentials(self.connection, customer.username, customer.password)
+        if self._user_index is not None:
+            self._user_index[customer.username] = (kind, customer.cust_id)
+
+    @locked
+    def load_staff(self) -> Dict[str, 'Staff']:
+        """Return all staff members keyed by staff id"""
+        rows = self.connection.execute("SELECT staff_id, data FROM staff ORDER BY staff_id")
+        return {staff_id: pickle.loads(data) for staff_id, data in rows}
+
+    @locked
+    def get_staff(self, staff_id: str) -> Optional['Staff']:
+        """Return a single staff member or None if it doesn't exist (primary key lookup)"""
+        row = self.connection.execute(
+            "SELECT data FROM staff WHERE staff_id = ?", (staff_id,)
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    @locked
+    def user_index(self, rebuild: bool = False) -> Dict[str, Tuple[str, str]]:
+        """Return username -> (role, id) for all users from the username columns
+
+        Building the index also hashes the passwords of users without a
+        credentials row made with PASSWORD_ITERATIONS (e.g. after a
+        migration); only those rows are decoded.
+        """
+        if self._user_index is None or rebuild:
+            rows = self.connection.execute(
+                "SELECT username, 'staff', staff_id FROM staff "
+                "UNION ALL SELECT username, kind, cust_id FROM customers"
+            )
+            self._user_index = {username: (role, user_id) for username, role, user_id in rows}
+            missing = self.connection.execute(
+                "SELECT data FROM staff WHERE username NOT IN "
+                "(SELECT username FROM credentials WHERE iterations = :iterations) "
+                "UNION ALL SELECT data FROM customers WHERE username NOT IN "
+                "(SELECT username FROM credentials WHERE iterations = :iterations)",
+                {'iterations': PASSWORD_ITERATIONS}
+            ).fetchall()
+            with self.connection:
+                for (data,) in missing:
+                    user = pickle.loads(data)
+                    insert_credentials(self.connection, user.username, user.password)
+        return self._user_index
+
+    @locked
+    def user_credentials(self, username: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """Return the (iterations, salt, password hash) of a username, or None if it has none"""
+        row = self.connection.execute(
+            "SELECT iterations, salt, digest FROM credentials WHERE username = ?", (username,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    @locked
+    def load_payments(self) -> Dict[str, 'Payment']:
+        """Return all payments keyed by payment id"""
+        rows = self.connection.execute("SELECT payment_id, data FROM payments ORDER BY rowid")
+        return {payment_id: pickle.loads(data) for payment_id, data in rows}
+
+    @locked
+    def add_payment(self, payment: 'Payment'):
+        """Store a new payment record"""
+        with self.connection:
+            insert_payment(self.connection, payment)
+
+    @locked
+    def check_out(self, kind: str, customer: 'Customer', order: 'Order',
+                  payment: 'Payment' = None, charge_to_account: bool = False) -> bool:
+        """Validate and commit a checkout in a single transaction
+
+        Args:
+            kind (str): Customer kind ('private' or 'corporate')
+            customer (Customer): The customer placing the order
+            order (Order): The new order
+            payment (Payment): Card payment record, None for account payments
+            charge_to_account (bool): Add the order total to the customer balance
+
+        Returns:
+            bool: True if committed, False if the customer is unknown or over the limit
+        """
+        previous_balance = customer.cust_balance
+        try:
+            with self.connection:
+                stored = self.get_customer(kind, customer.cust_id)
+                if stored is None:
+                    return False
+
+                if charge_to_account:
+                    new_balance = stored.cust_balance + order.total_amount
+                    if new_balance > stored.max_owing:
+                        return False
+                    customer.cust_balance = new_balance
+
+                insert_order(self.connection, order)
+                insert_customer(self.connection, kind, customer)
+                if payment:
+                    insert_payment(self.connection, payment)
+        except Exception:
+            customer.cust_balance = previous_balance
+            raise
+        return True
+
+    @locked
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+
+def migrate_pickles(data_dir: str = 'data', database: str = DATABASE_FILE) -> Dict[str, int]:
+    """Import all pickle stores of a data directory into a SQLite database
+
+    Existing rows with the same keys are replaced, so the migration can be rerun.
+
+    Args:
+        data_dir (str): Directory containing the *.pkl files
+        database (str): Path of the SQLite database to fill
+
+    Returns:
+        Dict[str, int]: Number of rows imported per table
+    """
+    source = PickleStore(data_dir)
+    target = SQLiteStore(database)
+    counts = {"orders": 0, "customers": 0, "staff": 0, "payments": 0}
+    try:
+        with target.connection:
+            for order in source.orders.get_orders().values():
+                insert_order(target.connection, order)
+                counts["orders"] += 1
+            for kind in CUSTOMER_FILES:
+                for customer in source.load_customers(kind).values():
+                    insert_customer(target.connection, kind, customer)
+                    counts["customers"] += 1
+            for staff in source.load_staff().values():
+                insert_staff(target.connection, staff)
+                counts["staff"] += 1
+            for payment in source.load_payments().values():
+                insert_payment(target.connection, payment)
+                counts["payments"] += 1
+    finally:
+        target.close()
+    return counts
+
+
+def migrate_job(data_dir: str = 'data', database: Optional[str] = None) -> int:
+    """Run migrate_pickles and print the number of rows imported per table
+
+    Args:
+        data_dir (str): Directory containing the *.pkl files
+        database (str): Path of the SQLite database, None for <data_dir>/fhv.db
+
+    Returns:
+        int: Process exit code
+    """
+    database = database or os.path.join(data_dir, 'fhv.db')
+    imported = migrate_pickles(data_dir, database)
+    print(f"Migrated into {database}: " + ", ".join(f"{count} {table}" for table, count in imported.items()))
+    return 0
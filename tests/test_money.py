@@ -0,0 +1,94 @@
+import pickle
+import unittest
+from datetime import date
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+from model import Customer, DeliveryMethod, Order, UnitPriceVeggie
+from money import Money, MoneyField, upgrade_money_fields
+
+
+class Priced:
+    '''Minimal owner of a MoneyField'''
+    price = MoneyField()
+
+
+class MoneyTest(unittest.TestCase):
+    '''Integer cents arithmetic of Money'''
+    def test_from_decimal_rounds_half_up(self):
+        self.assertEqual(Money.from_decimal(Decimal('0.125')).cents, 13)
+        self.assertEqual(Money.from_decimal(Decimal('0.124')).cents, 12)
+        self.assertEqual(Money.from_decimal(Decimal('-0.125')).cents, -13)
+        self.assertEqual(Money.from_decimal('19.995').cents, 2000)
+        self.assertEqual(Money.from_decimal(Decimal('0.129'), ROUND_DOWN).cents, 12)
+
+    def test_matches_decimal_quantize(self):
+        for thousandths in range(-2000, 2001, 7):
+            amount = Decimal(thousandths).scaleb(-3)
+            for rounding in (ROUND_HALF_UP, ROUND_DOWN):
+                expected = amount.quantize(Decimal('0.01'), rounding=rounding)
+                self.assertEqual(Money.from_decimal(amount, rounding).to_decimal(), expected)
+
+    def test_multiply(self):
+        price = Money(1999)
+        self.assertEqual(price.multiply(Decimal('1.5')).cents, 2998)  # 29.985 rounded down
+        self.assertEqual(price.multiply(Decimal('1.5'), ROUND_HALF_UP).cents, 2999)
+        self.assertEqual(price.multiply(3).cents, 5997)
+        self.assertEqual(Money(5).multiply(Decimal('0.5'), ROUND_HALF_UP).cents, 3)
+
+    def test_parse_and_format(self):
+        self.assertEqual(Money.parse('$1,234.50').cents, 123450)
+        self.assertEqual(f"{Money(705):.2f}", "7.05")
+        self.assertEqual(sum([Money(1), Money(2)]), Money(3))
+
+
+class MoneyFieldTest(unittest.TestCase):
+    '''Descriptor storing amounts in "<name>_cents"'''
+    def test_cents_round_trip(self):
+        priced = Priced()
+        priced.price = Decimal('12.345')
+        self.assertEqual(priced.price_cents, 1235)
+        self.assertEqual(priced.price, Decimal('12.35'))
+        self.assertNotIn('price', vars(priced))
+
+        priced.price_cents = 999
+        self.assertEqual(priced.price, Decimal('9.99'))
+
+        restored = pickle.loads(pickle.dumps(priced))
+        self.assertEqual(restored.price_cents, 999)
+        self.assertEqual(restored.price, Decimal('9.99'))
+
+    def test_upgrade_money_fields(self):
+        state = upgrade_money_fields(Priced, {'price': Decimal('4.20'), 'name': 'x'})
+        self.assertEqual(state, {'price_cents': 420, 'name': 'x'})
+
+    def test_order_loads_decimal_pickle(self):
+        customer = Customer("Old", "Pickle", "old", "secret", "5 km", Decimal('0.00'),
+                            Decimal('100.00'), "P9001")
+
+        # Build an order and an item the way older versions pickled them:
+        # Decimal amounts under the plain names and the customer embedded
+        item = UnitPriceVeggie.__new__(UnitPriceVeggie)
+        item.__dict__.update({'item_name': 'Carrot', 'quantity': 2,
+                              'price_per_unit': Decimal('1.50'), 'total_price': Decimal('3.00')})
+        order = Order.__new__(Order)
+        order.__dict__.update({
+            'order_number': 'ORD1', 'order_customer': customer, 'order_date': date(2024, 1, 1),
+            'order_status': None, 'list_of_items': [item], 'delivery_method': DeliveryMethod.DELIVERY,
+            'delivery_fee': Decimal('10.00'), 'subtotal': Decimal('3.00'), 'discount': Decimal('0.00'),
+            'sales_amount': Decimal('3.00'), 'total_amount': Decimal('13.00'),
+        })
+        data = pickle.dumps(order)
+
+        loaded = pickle.loads(data)
+        self.assertEqual(loaded.total_amount_cents, 1300)
+        self.assertEqual(loaded.delivery_fee, Decimal('10.00'))
+        self.assertEqual(loaded.subtotal, Decimal('3.00'))
+        self.assertEqual(loaded.cust_id, 'P9001')
+        self.assertEqual(loaded.customer_kind, 'private')
+        self.assertNotIn('total_amount', vars(loaded))
+        self.assertEqual(loaded.list_of_items[0].price_per_unit_cents, 150)
+        self.assertEqual(loaded.list_of_items[0].total_price, Decimal('3.00'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from model import Customer, DeliveryMethod, Order, OrderStatus, UnitPriceVeggie
+from repository import PASSWORD_ITERATIONS, OrderRepository, hash_password, password_matches
+
+
+def make_customer() -> Customer:
+    """Return a private customer that is never saved to a store"""
+    return Customer("Test", "Customer", "test", "secret", "5 km", Decimal('0.00'),
+                    Decimal('100.00'), "P9000")
+
+def make_order(customer: Customer, order_date: date, units: int = 2) -> Order:
+    """Return a pickup order of a few carrots"""
+    item = UnitPriceVeggie("Carrot", units, Decimal('1.50'))
+    item.calculate_total()
+    order = Order(customer, order_date, DeliveryMethod.PICKUP)
+    order.set_items([item])
+    return order
+
+
+class OrderJournalTest(unittest.TestCase):
+    '''The base file plus journal format of OrderRepository'''
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.customer = make_customer()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.data_dir, filename)
+
+    def open_repository(self, snapshot_threshold: int = 200) -> OrderRepository:
+        """Open a repository on the test directory, as a new process would"""
+        return OrderRepository(self.path('orders.pkl'), self.path('orders.journal'),
+                               snapshot_threshold=snapshot_threshold,
+                               daily_sales_filename=self.path('daily_sales.pkl'),
+                               product_sales_filename=self.path('product_sales.pkl'))
+
+    def check_out(self, repository: OrderRepository, order: Order):
+        repository.append_record(('checkout', order, 'private', self.customer, None))
+
+    def test_replay_after_reopen(self):
+        repository = self.open_repository()
+        first = make_order(self.customer, date(2024, 1, 2))
+        second = make_order(self.customer, date(2024, 1, 1), units=3)
+        self.check_out(repository, first)
+        self.check_out(repository, second)
+        self.assertTrue(repository.update_status(first.order_number, OrderStatus.FULFILLED))
+
+        reopened = self.open_repository()
+        orders = reopened.get_orders()
+        self.assertEqual(set(orders), {first.order_number, second.order_number})
+        self.assertEqual(orders[first.order_number].order_status, OrderStatus.FULFILLED)
+        self.assertEqual(reopened.stats()["journal_records"], 3)
+        self.assertEqual([order.order_number for order in reopened.orders_between()],
+                         [second.order_number, first.order_number])
+        self.assertEqual([order.order_number for order in reopened.orders_by_status(OrderStatus.PENDING)],
+                         [second.order_number])
+        self.assertEqual(reopened.sales_totals().sales_amount, Decimal('7.50'))
+
+    def test_torn_final_record_is_dropped(self):
+        repository = self.open_repository()
+        kept = make_order(self.customer, date(2024, 1, 1))
+        self.check_out(repository, kept)
+        good_size = os.path.getsize(self.path('orders.journal'))
+
+        # A crash in the middle of an append leaves part of a record behind
+        torn = pickle.dumps(('checkout', make_order(self.customer, date(2024, 1, 2)), 'private',
+                             self.customer, None))
+        with open(self.path('orders.journal'), 'ab') as file:
+            file.write(torn[:len(torn) // 2])
+
+        reopened = self.open_repository()
+        self.assertEqual(list(reopened.get_orders()), [kept.order_number])
+        self.assertEqual(os.path.getsize(self.path('orders.journal')), good_size)
+
+        # Appends after the truncation replay normally
+        later = make_order(self.customer, date(2024, 1, 3))
+        self.check_out(reopened, later)
+        self.assertEqual(list(self.open_repository().get_orders()), [kept.order_number, later.order_number])
+
+    def test_unreadable_complete_record_is_kept(self):
+        repository = self.open_repository()
+        self.check_out(repository, make_order(self.customer, date(2024, 1, 1)))
+
+        # A whole record whose class is gone is not a torn write and must not cost later orders
+        with open(self.path('orders.journal'), 'ab') as file:
+            file.write(b"cmodel\nRemovedRecord\n.")
+            pickle.dump(('checkout', make_order(self.customer, date(2024, 1, 2)), 'private',
+                         self.customer, None), file)
+        size = os.path.getsize(self.path('orders.journal'))
+
+        with self.assertRaises(AttributeError):
+            self.open_repository().get_orders()
+        self.assertEqual(os.path.getsize(self.path('orders.journal')), size)
+
+    def test_snapshot_at_threshold(self):
+        repository = self.open_repository(snapshot_threshold=3)
+        orders = [make_order(self.customer, date(2024, 1, day)) for day in (1, 2)]
+        for order in orders:
+            self.check_out(repository, order)
+        self.assertFalse(os.path.exists(self.path('orders.pkl')))
+        self.assertEqual(repository.stats()["journal_records"], 2)
+
+        # The third record reaches the threshold and folds the journal into the base file
+        self.assertTrue(repository.update_status(orders[0].order_number, OrderStatus.FULFILLED))
+        self.assertEqual(repository.stats()["journal_records"], 0)
+        self.assertEqual(os.path.getsize(self.path('orders.journal')), 0)
+        with open(self.path('orders.pkl'), 'rb') as file:
+            base = pickle.load(file)
+        self.assertEqual(set(base), {order.order_number for order in orders})
+        self.assertEqual(base[orders[0].order_number].order_status, OrderStatus.FULFILLED)
+
+        reopened = self.open_repository(snapshot_threshold=3)
+        self.assertEqual(set(reopened.get_orders()), {order.order_number for order in orders})
+        self.assertEqual(reopened.stats()["journal_records"], 0)
+        self.assertEqual(reopened.sales_totals().order_count, 2)
+
+    def test_rollups_with_a_shared_journal(self):
+        repository = self.open_repository()
+        self.check_out(repository, make_order(self.customer, date(2024, 1, 1)))
+        self.assertTrue(repository.rebuild_rollups())
+        self.check_out(repository, make_order(self.customer, date(2024, 1, 2)))
+
+        # Another process appends to the same journal, so this one reloads on its next read
+        self.check_out(self.open_repository(), make_order(self.customer, date(2024, 1, 3)))
+        self.assertEqual(repository.sales_totals().order_count, 3)
+        self.assertEqual(repository.sales_totals().sales_amount, Decimal('9.00'))
+        self.assertEqual(repository.product_sales().veggies, {"Carrot": 6})
+        self.assertTrue(repository.rebuild_rollups())
+
+    def test_product_sales_is_a_copy(self):
+        repository = self.open_repository()
+        self.check_out(repository, make_order(self.customer, date(2024, 1, 1)))
+        product_sales = repository.product_sales()
+
+        # Later checkouts must not change a result another thread is iterating
+        self.check_out(repository, make_order(self.customer, date(2024, 1, 2), units=3))
+        self.assertEqual(product_sales.veggies, {"Carrot": 2})
+        self.assertEqual(repository.product_sales().veggies, {"Carrot": 5})
+
+
+class PasswordHashTest(unittest.TestCase):
+    '''The PBKDF2 credentials kept next to the user index'''
+    def test_parameters_are_stored_with_the_hash(self):
+        iterations, salt, digest = hash_password("secret")
+        self.assertEqual(iterations, PASSWORD_ITERATIONS)
+        self.assertEqual(len(salt), 16)
+        self.assertNotEqual(hash_password("secret")[1], salt)
+        self.assertTrue(password_matches("secret", (iterations, salt, digest)))
+        self.assertFalse(password_matches("Secret", (iterations, salt, digest)))
+
+    def test_verifies_with_the_stored_iterations(self):
+        credentials = hash_password("secret", iterations=1000)
+        self.assertTrue(password_matches("secret", credentials))
+        self.assertFalse(password_matches("secret", (2000,) + credentials[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
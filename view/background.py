@@ -0,0 +1,86 @@
+import queue
+import threading
+
+class BackgroundLoader:
+    '''Runs data fetches on worker threads and hands the results back to the
+    Tk thread, which polls for them with after() instead of blocking.
+
+    Only the latest task of a loader is current: starting a new one (the
+    user navigated elsewhere) or calling cancel() makes the results of the
+    older ones be dropped when they arrive.'''
+    # Milliseconds between checks for finished tasks
+    POLL_MS = 50
+
+    def __init__(self, widget):
+        """Initialize the loader
+
+        Args:
+            widget: Any widget of the window, used to schedule the polling
+        """
+        self.widget = widget
+        self.results = queue.Queue()
+        self.current = None  # Token of the task whose result is still wanted
+        self.callbacks = {}  # Token -> (on_done, on_error)
+        self.poll_job = None
+
+    def run(self, fetch, on_done, on_error=None):
+        """Start fetch() on a worker thread, replacing any task still running
+
+        Args:
+            fetch: Function without arguments returning the data; must not touch widgets
+            on_done: Called on the Tk thread with the result
+            on_error: Called on the Tk thread with the exception, if fetch raises
+        """
+        self.cancel()
+        token = object()
+        self.current = token
+        self.callbacks[token] = (on_done, on_error)
+        threading.Thread(target=self._work, args=(token, fetch), daemon=True).start()
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        """Forget the current task; its result is discarded when it arrives"""
+        self.current = None
+        self.callbacks.clear()
+
+    def close(self):
+        """Cancel the current task and stop polling, e.g. when the window closes"""
+        self.cancel()
+        if self.poll_job is not None:
+            try:
+                self.widget.after_cancel(self.poll_job)
+            except Exception:
+                pass  # The widget is already destroyed
+            self.poll_job = None
+
+    @property
+    def busy(self) -> bool:
+        """True while the current task hasn't delivered its result"""
+        return self.current is not None
+
+    def _work(self, token, fetch):
+        """Worker thread body: run fetch and queue its outcome"""
+        try:
+            self.results.put((token, True, fetch()))
+        except Exception as e:
+            self.results.put((token, False, e))
+
+    def _poll(self):
+        """Deliver finished results on the Tk thread and keep polling while a task runs"""
+        self.poll_job = None
+        while True:
+            try:
+                token, succeeded, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if token is not self.current:
+                continue  # Cancelled or replaced by a newer task
+            on_done, on_error = self.callbacks.pop(token)
+            self.current = None
+            if succeeded:
+                on_done(value)
+            elif on_error:
+                on_error(value)
+        if self.current is not None:
+            self.poll_job = self.widget.after(self.POLL_MS, self._poll)
@@ -5,6 +5,7 @@ from .payment import Payment
 from decimal import Decimal
 from .make_payment import MakePayment
 from .staff_home import AutoTreeview
+from .background import BackgroundLoader
 
 class CustomerHome:
     def __init__(self, root, customer, controller):
@@ -25,6 +26,7 @@ class CustomerHome:
         self.current_frame = None # Current frame displayed
         self.current_treeview = None 
         self.loading_label = None
+        self.loader = BackgroundLoader(self.root)  # Fetches order lists off the Tk thread
         
         # Setup window layout
         self.setup_window()
@@ -111,6 +113,7 @@ class CustomerHome:
     def show_frame(self, frame_id, title, create_func=None):
         """Generic method to display frames"""
         try:
+            self.loader.cancel()  # Drop any order list still loading
             self.show_loading()
             
             # Clear display area
@@ -157,14 +160,14 @@ class CustomerHome:
             font=('Helvetica', 12)
         )
         self.loading_label.pack(expand=True)
-        self.root.update()
+        # Draw the indicator without processing user events in the middle of a handler
+        self.root.update_idletasks()
 
     def hide_loading(self):
         """Hide loading indicator"""
         if self.loading_label:
             self.loading_label.master.destroy()
             self.loading_label = None
-            self.root.update()
 
     def create_new_order_frame(self):
         """Create order frame"""
@@ -332,17 +335,39 @@ class CustomerHome:
         self.show_frame('new_order', "Place New Order", self.create_new_order_frame)
         
     def view_current_orders(self):
-        """Display current orders in treeview"""
-        self.show_treeview_content("Current Orders", self.get_current_orders_data())
+        """Display current orders in treeview, loading them in the background"""
+        self.load_treeview_content("Current Orders", self.get_current_orders_data)
 
     def view_previous_orders(self):
-        """Display previous orders in treeview"""
-        self.show_treeview_content("Previous Orders", self.get_previous_orders_data())
+        """Display previous orders in treeview, loading them in the background"""
+        self.load_treeview_content("Previous Orders", self.get_previous_orders_data)
+
+    def load_treeview_content(self, title, fetch):
+        """Show the loading indicator, fetch the rows on a worker thread and display them
+
+        Args:
+            title (str): Title of the treeview
+            fetch: Function returning (headers, rows); runs off the Tk thread
+        """
+        for widget in self.display_frame.winfo_children():
+            widget.pack_forget()
+        self.show_loading()
+
+        def show(data):
+            self.hide_loading()
+            self.show_treeview_content(title, data)
+
+        def show_error(e):
+            self.hide_loading()
+            messagebox.showerror("Error", f"Error loading {title.lower()}: {str(e)}")
+
+        self.loader.run(fetch, show, show_error)
         
     def on_logout(self):
         """Handle logout"""
         if messagebox.askyesno("Logout Confirmation", "Are you sure you want to logout?"):
             try:
+                self.loader.close()
                 self.root.destroy()
                 self.login_window.deiconify()
             except Exception as e:
@@ -352,6 +377,7 @@ class CustomerHome:
         """Handle window closing"""
         if messagebox.askyesno("Quit Confirmation", "Are you sure you want to quit the application?"):
             try:
+                self.loader.close()
                 self.root.destroy()
                 self.login_window.destroy()
             except Exception as e:
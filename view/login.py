@@ -7,6 +7,9 @@ from model import Person, Staff, Customer, CorporateCustomer
 from .customer_home import CustomerHome
 from .staff_home import StaffHome
 
+# Number of demo credentials listed under the login form
+CREDENTIAL_HINT_LIMIT = 20
+
 class Login:
     """Login class handles user authentication and provides the login interface"""
 
@@ -16,42 +19,22 @@ class Login:
         Args:
             controller: Main application controller instance
         """
-        # Get the controller and user data
+        # Get the controller; users are loaded on login, not up front
         self.controller = controller
-        self.private_customers = self.controller.private_customers
-        self.corporate_customers = self.controller.corporate_customers
-        self.staff_members = self.controller.staff_members
 
         # Create and configure the main window
         self.root = tk.Tk()
         self.root.title("FHV Company - Login")
         self.root.resizable(False, False)  # Disable window resizing
-        
-        # Get user information from controller
-        self.private_customers = controller.private_customers
-        self.corporate_customers = controller.corporate_customers
-        self.staff_members = controller.staff_members
 
         # Set up the user interface
         self.create_widgets()
 
     def get_user_info(self):
-        """Collect and format user credentials for display"""
-        user_info = []
-        
-        # Format and add staff credentials
-        for staff in self.staff_members.values():
-                user_info.append(f"{staff.username}, {staff.password}")
-
-        # Format and add private customer credentials
-        for customer in self.private_customers.values():
-            user_info.append(f"{customer.username}, {customer.password}")
-
-        # Format and add corporate customer credentials
-        for customer in self.corporate_customers.values():
-            user_info.append(f"{customer.username}, {customer.password}")
-
-        return user_info
+        """Collect and format the first few user credentials for display"""
+        # Staff first, then private and corporate customers
+        return [f"{user.username}, {user.password}"
+                for user in self.controller.sample_users(CREDENTIAL_HINT_LIMIT)]
 
     def login(self):
         """Handle user login process"""
@@ -134,17 +117,19 @@ class Login:
         hint_text = tk.Text(main_frame, height=10, width=40, wrap=tk.WORD)
         hint_text.pack(pady=5)
 
-        # Display available credentials
-        user_info = self.get_user_info()
-        for info in user_info:
-            hint_text.insert(tk.END, f"{info}\n")
-            
-        # Add system notes at the end of credentials
+        # Add system notes; the credentials are filled in once the window is shown
         hint_text.insert(tk.END, "\nNotes:\n")
         hint_text.insert(tk.END, "This system is developed by mac OS, please run it on mac OS. ")
         # hint_text.insert(tk.END, "The function of canceling orders is missing.")
         
         hint_text.config(state='disabled')  # Make text read-only
+        self.root.after_idle(self.show_user_info, hint_text)
+
+    def show_user_info(self, hint_text):
+        """Insert the available credentials above the notes"""
+        hint_text.config(state='normal')
+        hint_text.insert('1.0', "".join(f"{info}\n" for info in self.get_user_info()))
+        hint_text.config(state='disabled')
 
     def run(self):
         """Start the login window main loop"""
@@ -1,8 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP, InvalidOperation
+from catalog import SECTION_SALE_TYPES
+from money import Money
 from .my_widgts import ValidatedSpinbox
 
+# How often an open product view checks the catalog files for changes
+CATALOG_CHECK_MS = 2000
+
+# Most products listed in the veggie combobox at once
+VEGGIE_MATCH_LIMIT = 20
+
+# Keys that move through the combobox instead of editing the search text
+NAVIGATION_KEYS = {'Up', 'Down', 'Left', 'Right', 'Return', 'KP_Enter', 'Escape', 'Tab',
+                   'Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R'}
+
 class Product:
     def __init__(self, parent, controller, user):
         '''Initialize the Product class with main frame, notebook, and product data
@@ -17,16 +29,14 @@ class Product:
             self.controller = controller
             self.user = user
 
-            # Initialize product data lists
-            self.all_veggies_list = self.controller.all_veggies_list  # List of all vegetables
-            self.veggies_weight_list = self.controller.veggies_weight_list  # Weight-based vegetables
-            self.veggies_unit_list = self.controller.veggies_unit_list  # Unit-based vegetables  
-            self.veggies_pack_list = self.controller.veggies_pack_list  # Pack-based vegetables
+            # Product catalog and box configuration dictionaries
+            self._load_catalog()
+            self.catalog_stale = False
+            self.veggie_options = []  # Items currently listed in the veggie combobox
 
-            # Initialize box configuration dictionaries
-            self.smallbox_default_dict = self.controller.smallbox_default_dict
-            self.mediumbox_default_dict = self.controller.mediumbox_default_dict
-            self.largebox_default_dict = self.controller.largebox_default_dict
+            # Cart row id -> (item type, quantity, unit price, subtotal, box content catalog ids),
+            # so checkout never reparses the display strings
+            self.cart_amounts = {}
 
             # Set box sizes
             self.small_size = 3
@@ -53,11 +63,88 @@ class Product:
             self._setup_box_products()     # Premade box selection
             self._setup_process_order()    # Delivery and checkout options
             self._setup_cart()             # Shopping cart display
+
+            # Follow catalog changes until the view is closed
+            self.controller.catalog_watcher.subscribe(self._on_catalog_changed)
+            self.main_frame.bind('<Destroy>', self._on_destroy)
+            self.catalog_check_job = self.main_frame.after(CATALOG_CHECK_MS, self._check_catalog)
             
         except Exception as e:
             messagebox.showerror("Initialization Error", f"Error initializing product system: {str(e)}")
             raise
 
+    def _load_catalog(self):
+        """Take the current catalog version and box configurations from the controller"""
+        snapshot = self.controller.catalog_snapshot  # Catalog and boxes of the same version
+        self.catalog_version = snapshot.version
+        self.catalog = snapshot.catalog
+        boxes = snapshot.boxes
+        self.smallbox_default_dict = boxes['small']
+        self.mediumbox_default_dict = boxes['medium']
+        self.largebox_default_dict = boxes['large']
+
+    def _on_catalog_changed(self, version):
+        """Catalog listener; may run off the Tk thread, so only flag the view"""
+        self.catalog_stale = True
+
+    def _check_catalog(self):
+        """Poll the catalog files and refresh the view when a new version was published"""
+        try:
+            self.controller.refresh_catalog()
+            if self.catalog_stale or self.catalog_version != self.controller.catalog_watcher.version:
+                self.catalog_stale = False
+                self.refresh_catalog()
+        except Exception as e:
+            print(f"Error refreshing catalog: {str(e)}")
+        self.catalog_check_job = self.main_frame.after(CATALOG_CHECK_MS, self._check_catalog)
+
+    def _on_destroy(self, event):
+        """Stop polling and listening once the main frame is destroyed"""
+        if event.widget is not self.main_frame:
+            return
+        self.controller.catalog_watcher.unsubscribe(self._on_catalog_changed)
+        try:
+            self.main_frame.after_cancel(self.catalog_check_job)
+        except tk.TclError:
+            pass
+
+    def refresh_catalog(self):
+        """Update the comboboxes and box prices to the new catalog, keeping the selections
+
+        Items already in the cart keep the price they were added at.
+        """
+        selected_veggie = self._selected_item(self.veggie_product_combo, self.veggie_options)
+        selected_contents = [self._selected_item(combo, self.catalog.items)
+                             for _, combo in self.item_widgets]
+        self._load_catalog()
+
+        # Veggie combobox, listing the selected product's matches if it is still sold
+        self._update_veggie_products()
+        item = self.catalog.get(selected_veggie) if selected_veggie is not None else None
+        if item is not None and item.sale_type == SECTION_SALE_TYPES[self.veggie_type_var.get()]:
+            self.veggie_options = self.catalog.search(item.name, item.sale_type, VEGGIE_MATCH_LIMIT)
+            self.veggie_product_combo['values'] = [option.label for option in self.veggie_options]
+            self.veggie_product_combo.current(self.veggie_options.index(item))
+
+        # Box prices and contents
+        for size, button in self.box_size_buttons.items():
+            price = getattr(self, f"{size}box_default_dict")['price']
+            button.config(text=f"{size.capitalize()} (${float(price):.2f})")
+        labels = [item.label for item in self.catalog]
+        for _, combo in self.item_widgets:
+            combo['values'] = labels
+        self._update_b_contents()
+        for (_, combo), item_id in zip(self.item_widgets, selected_contents):
+            index = self.catalog.index(item_id) if item_id is not None else -1
+            if index >= 0:
+                combo.current(index)
+
+    @staticmethod
+    def _selected_item(combo, options):
+        """Return the id of the catalog item selected in a combobox, or None"""
+        index = combo.current()
+        return options[index].item_id if 0 <= index < len(options) else None
+
     def _setup_veggie_products(self):
         """Set up the individual vegetable product selection interface"""
         # Main container using grid layout
@@ -88,10 +175,11 @@ class Product:
         self.veggie_product_combo = ttk.Combobox(
             product_frame,
             textvariable=self.veggie_product_var,
-            state='readonly',
             width=40
         )
         self.veggie_product_combo.grid(row=0, column=1, sticky='ew', padx=5)
+        # Typing filters the list to the best catalog matches
+        self.veggie_product_combo.bind('<KeyRelease>', self._search_veggie_products)
 
         # Quantity selection area
         quantity_frame = ttk.Frame(main_container)
@@ -132,15 +220,18 @@ class Product:
         size_frame = ttk.Frame(main_container)
         size_frame.grid(row=0, column=0, sticky='ew', padx=5, pady=5)
         
+        self.box_size_buttons = {}
         for i, size in enumerate(['small', 'medium', 'large']):
             price = getattr(self, f"{size}box_default_dict")['price']
-            ttk.Radiobutton(
+            button = ttk.Radiobutton(
                 size_frame,
                 text=f"{size.capitalize()} (${float(price):.2f})",
                 value=size,
                 variable=self.box_size_var,
                 command=self._update_b_contents
-            ).grid(row=0, column=i, padx=5)
+            )
+            button.grid(row=0, column=i, padx=5)
+            self.box_size_buttons[size] = button
         
         # Box contents selection area
         self.contents_label_frame = ttk.LabelFrame(main_container, text="Box Contents")
@@ -157,7 +248,7 @@ class Product:
             label.grid(row=i, column=0, padx=5, pady=2, sticky='w')
             
             combo = ttk.Combobox(self.contents_frame, state='readonly', width=40)
-            combo['values'] = self.all_veggies_list
+            combo['values'] = [item.label for item in self.catalog]
             combo.grid(row=i, column=1, padx=5, pady=2, sticky='ew')
             
             self.item_widgets.append((label, combo))
@@ -296,25 +387,27 @@ class Product:
         # Update quantity input type
         self.veggie_quantity_spinbox.model = 'float' if current_type == 'weight/kg' else 'int'
 
-        # Type mapping for list selection
-        type_mapping = {
-            'weight/kg': 'weight',
-            'unit': 'unit',
-            'pack': 'pack'
-        }
-        
-        # Get corresponding product list
-        list_name = f'veggies_{type_mapping[current_type]}_list'
-        options = getattr(self, list_name)
+        # Get corresponding catalog items
+        options = self.catalog.search('', SECTION_SALE_TYPES[current_type], VEGGIE_MATCH_LIMIT)
+        self.veggie_options = options
         
         # Update combobox values
         if options:
-            self.veggie_product_combo['values'] = options
-            self.veggie_product_combo.set(options[0])
+            self.veggie_product_combo['values'] = [item.label for item in options]
+            self.veggie_product_combo.current(0)
         else:
             self.veggie_product_combo['values'] = []
             self.veggie_product_combo.set('')
 
+    def _search_veggie_products(self, event):
+        """List the products of the selected type matching the typed text, keeping the text"""
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        text = self.veggie_product_var.get()
+        sale_type = SECTION_SALE_TYPES[self.veggie_type_var.get()]
+        self.veggie_options = self.catalog.search(text, sale_type, VEGGIE_MATCH_LIMIT)
+        self.veggie_product_combo['values'] = [item.label for item in self.veggie_options]
+
     def _update_b_contents(self):
         """Update the box contents based on selected box size"""
         current_size = self.box_size_var.get()
@@ -328,12 +421,13 @@ class Product:
                 label.grid()
                 combo.grid()
                 
-                # Set default content from box configuration
-                default_content = box_dict['contents'][i]
-                for option in self.all_veggies_list:
-                    if default_content.split(' x ')[0] in option:
-                        combo.set(option)
-                        break
+                # Set default content from the box configuration, resolved to catalog ids at load
+                item_ids = box_dict['item_ids']
+                index = self.catalog.index(item_ids[i]) if i < len(item_ids) and item_ids[i] else -1
+                if index >= 0:
+                    combo.current(index)
+                else:
+                    combo.set('')
             else:
                 # Hide excess widgets
                 label.grid_remove()
@@ -343,10 +437,11 @@ class Product:
         """Add individual vegetable product to the shopping cart."""
         try:
             # Validate product selection
-            product = self.veggie_product_var.get()
-            if not product:
+            index = self.veggie_product_combo.current()
+            if index < 0:
                 messagebox.showwarning("Warning", "Please select a product")
                 return
+            product = self.veggie_options[index]
 
             # Get and validate quantity
             quantity = Decimal(self.veggie_quantity_spinbox.get())
@@ -354,19 +449,19 @@ class Product:
                 messagebox.showwarning("Warning", "Quantity must be greater than zero")
                 return
             
-            # Calculate price and subtotal
-            name, price = product.split(' - $')
-            price = Decimal(price).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            subtotal = (price * quantity).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            # Calculate price and subtotal in cents
+            price = product.price
+            subtotal = price.multiply(quantity, ROUND_HALF_UP)
 
             # Add item to cart display
-            self.cart_tree.insert('', 'end', values=(
-                name,
+            row = self.cart_tree.insert('', 'end', values=(
+                product.name,
                 quantity,
-                f"${float(price):.2f}",
-                f"${float(subtotal):.2f}",
+                f"${price:.2f}",
+                f"${subtotal:.2f}",
                 ""  # No contents for individual products
             ))
+            self.cart_amounts[row] = (product.sale_type, quantity, price, subtotal, [])
         except (ValueError, InvalidOperation) as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
         except Exception as e:
@@ -379,28 +474,33 @@ class Product:
             size = self.box_size_var.get()
             quantity = int(self.box_quantity_spinbox.get())
             box_dict = getattr(self, f"{size}box_default_dict")
-            price = box_dict['price']
+            price = Money.from_decimal(box_dict['price'])
             
             # Calculate subtotal
-            subtotal = (price * Decimal(quantity)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            subtotal = price.multiply(quantity, ROUND_HALF_UP)
             
             # Get selected contents
             contents = []
             num_items = getattr(self, f"{size}_size")
             for i, (_, combo) in enumerate(self.item_widgets[:num_items]):
-                item_name = combo.get().split(' - $')[0]
-                contents.append(f"{item_name} x 1")
+                index = combo.current()
+                if index < 0:
+                    messagebox.showwarning("Warning", f"Please select item {i + 1}")
+                    return
+                contents.append(self.catalog.items[index])
             
-            contents_str = ", ".join(contents)
+            contents_str = ", ".join(f"{item.name} x 1" for item in contents)
             
             # Add box to cart display
-            self.cart_tree.insert('', 'end', values=(
+            row = self.cart_tree.insert('', 'end', values=(
                 f"{size.capitalize()} Box",
                 quantity,
-                f"${float(price):.2f}",
-                f"${float(subtotal):.2f}",
+                f"${price:.2f}",
+                f"${subtotal:.2f}",
                 contents_str
             ))
+            self.cart_amounts[row] = ('box', Decimal(quantity), price, subtotal,
+                                      [item.item_id for item in contents])
             
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
@@ -417,52 +517,50 @@ class Product:
             
             # Initialize order data
             self.cart_dict = []
-            subtotal = Decimal('0.00')
+            subtotal = Money(0)
             
             # Process cart items
             for item in self.cart_tree.get_children():
                 values = self.cart_tree.item(item)['values']
                 
                 name = values[0]
-                quantity = Decimal(values[1])
-                price = Decimal(values[2].replace('$', ''))
-                subtotal_item = Decimal(values[3].replace('$', ''))
-                contents = values[4] if values[4] else ""
+                item_type, quantity, price, subtotal_item, content_ids = self.cart_amounts[item]
                 
                 subtotal += subtotal_item
                 
                 # Create item record
                 cart_item = {
-                    'type': 'box' if 'Box' in name else self._determine_item_type(name),
+                    'type': item_type,
                     'name': name,
                     'quantity': quantity,
-                    'price': price,
-                    'subtotal': subtotal_item,
-                    'contents': contents
+                    'price': price.to_decimal(),
+                    'subtotal': subtotal_item.to_decimal(),
+                    'content_ids': content_ids
                 }
                 self.cart_dict.append(cart_item)
             
-            # Calculate discount
-            discount = Decimal('0.00')
+            # Calculate discount, rounded down to the cent like Order.calculate_discount
+            discount = Money(0)
             # First check if user has a discount rate attribute
             if hasattr(self.user, 'discount_rate'):
-                discount = subtotal * self.user.discount_rate
+                discount = subtotal.multiply(self.user.discount_rate, ROUND_DOWN)
             # If no discount_rate attribute, check if user type is corporate
             elif hasattr(self.controller, 'user_type') and self.controller.user_type == "corporate":
-                discount = subtotal * Decimal('0.10')
+                discount = subtotal.multiply(Decimal('0.10'), ROUND_DOWN)
                 
             # Calculate fees and total
-            delivery_fee = Decimal('10.00') if self.delivery_var.get() else Decimal('0.00')
+            delivery_fee = Money.from_decimal(Decimal('10.00')) if self.delivery_var.get() else Money(0)
             total = subtotal - discount + delivery_fee
             
             # Store order data in controller
             self.controller.temp_order_data = {
                 'cart_items': self.cart_dict,
+                'catalog': self.catalog,  # Version the content ids were picked from
                 'user': self.user,
-                'subtotal': subtotal,
-                'delivery_fee': delivery_fee,
-                'discount': discount,
-                'total': total,
+                'subtotal': subtotal.to_decimal(),
+                'delivery_fee': delivery_fee.to_decimal(),
+                'discount': discount.to_decimal(),
+                'total': total.to_decimal(),
                 'is_delivery': self.delivery_var.get(),
             }
             
@@ -475,33 +573,12 @@ class Product:
         except Exception as e:
             messagebox.showerror("Error", f"Error checking out order: {str(e)}")
 
-    def _determine_item_type(self, name):
-        """
-        Determine product type based on name
-        
-        Args:
-            name (str): Product name
-            
-        Returns:
-            str: Product type ('weight', 'unit', 'pack', 'box', or 'unknown')
-        """
-        if name in ["Small Box", "Medium Box", "Large Box"]:
-            return 'box'
-        
-        if "by weight/kg" in name:
-            return 'weight'
-        elif "by unit" in name:
-            return 'unit'
-        elif "by pack" in name:
-            return 'pack'
-        
-        return 'unknown'
-
     def clear_cart(self):
         """Clear all items from shopping cart"""
         try:
             for item in self.cart_tree.get_children():
                 self.cart_tree.delete(item)
+            self.cart_amounts.clear()
         except Exception as e:
             messagebox.showerror("Error", f"Error clearing cart: {str(e)}")
 
@@ -2,9 +2,22 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, date
 from decimal import Decimal, ROUND_DOWN
+from .background import BackgroundLoader
 
 class AutoTreeview(ttk.Treeview):
-    def __init__(self, parent, headers, data, controller=None, mode="readonly", *args, **kwargs):
+    '''Treeview of order rows kept in a Python-side buffer. Long lists are
+    virtualized: only the rows around the visible window exist as Tk items,
+    and the window is refilled from the buffer when the list is scrolled.'''
+    # Lists longer than this are virtualized unless the caller decides
+    VIRTUAL_THRESHOLD = 500
+    # Rows materialized above and below the visible window
+    VIRTUAL_MARGIN = 50
+    # Rows moved per mouse wheel notch
+    WHEEL_ROWS = 3
+    # Row height used until the style reports one
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, headers, data, controller=None, mode="readonly", virtual=None, *args, **kwargs):
         """Initialize Treeview with automatic configuration.
         
         Args:
@@ -13,64 +26,347 @@ class AutoTreeview(ttk.Treeview):
             data: Initial data to populate the Treeview.
             controller: Optional controller to handle user interactions.
             mode: Mode of the Treeview; can be "readonly" or "editable".
+            virtual: True/False to force the virtualized mode on or off, None to
+                use it when the data has more than VIRTUAL_THRESHOLD rows.
             *args, **kwargs: Additional arguments passed to the parent class.
         """
         super().__init__(parent, *args, **kwargs)
         self.controller = controller
         self.mode = mode
+        self.headers = list(headers)
         self["columns"] = headers
         self.heading("#0", text="", anchor="w")
         self.column("#0", width=0, stretch=tk.NO)
 
-        for header in headers:
-            self.heading(header, text=header, anchor="w")
+        for index, header in enumerate(headers):
+            self.heading(header, text=header, anchor="w", command=lambda c=index: self.sort_by(c))
             if header == "Items":
                 self.column(header, anchor="w", stretch=True, width=300, minwidth=200)
             else:
                 self.column(header, anchor="w", stretch=True, width=100)
 
+        # Row buffer: raw rows and their item ids (the first column, the order number)
+        self.rows = []
+        self.keys = []
+        self.virtual_setting = virtual
+        self.virtual = False
+        self.sort_column = None
+        self.sort_reverse = False
+        self.selected_keys = set()  # Selection of the buffer, including rows outside the window
+        self.offset = 0  # Buffer index of the first visible row
+        self.window = (0, 0)  # Buffer slice currently materialized
+        self.shown = {}  # Item id -> buffer row its Tk item currently displays
+        self.focus_index = None  # Buffer index of the keyboard focus in virtual mode
+
         self.tooltip = None
         self.bind('<Motion>', self._on_motion)
         self.bind('<Leave>', self._on_leave)
+        self.bind('<<TreeviewSelect>>', self._on_select, add="+")
+        self.bind('<Configure>', self._on_configure, add="+")
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.bind(sequence, self._on_wheel, add="+")
+        for sequence, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-up'),
+                               ('<Next>', 'page-down'), ('<Home>', 'home'), ('<End>', 'end')):
+            self.bind(sequence, lambda event, s=step: self._on_key(s), add="+")
 
         # Create single event binding only when mode is editable
         if self.mode == "editable":
             self.bind("<Double-Button-1>", self._on_double_click, add="+")  # Changed from Double-1
             self.bind("<Button-3>", self._show_context_menu, add="+")
 
-        self.update_data(data)
-
-        self.scroll_y = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.scroll_y = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
         self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.scroll_x = ttk.Scrollbar(parent, orient="horizontal", command=self.xview)
         self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
 
-        self.config(yscrollcommand=self.scroll_y.set, xscrollcommand=self.scroll_x.set)
+        self.config(yscrollcommand=self._on_yscroll, xscrollcommand=self.scroll_x.set)
+        self.update_data(data)
         self.pack(fill=tk.BOTH, expand=True)
 
     def update_data(self, data):
         """Update the Treeview with new data.
+
+        The rows are kept in the buffer as given; cells are only converted to
+        text when their row is materialized. Rows are matched to the Tk items
+        by order number, so only rows that were added, removed, changed or
+        moved are touched. The current sort order, the first visible row and
+        the selection of rows that are still present are kept.
         
         Args:
             data: List of rows, where each row is a list of values to display.
         """
-        # Clear existing items from the Treeview
-        for item in self.get_children():
-            self.delete(item)
-
-        # Insert new data into the Treeview
-        for row in data:
-            row_values = []
-            for i, value in enumerate(row):
-                if value is None:
-                    row_values.append("N/A")  # Replace None with "N/A"
-                elif i == 4:  # Special handling for Items column
-                    # No length restriction; insert the full value
-                    row_values.append(str(value))
-                else:
-                    row_values.append(str(value))  # Convert other values to string
-            self.insert("", "end", values=row_values)  # Insert the row into the Treeview
+        top_key = self.keys[self.offset] if self.offset < len(self.keys) else None
+        self.rows = list(data)
+        self.keys = self._row_keys(self.rows)
+        if self.virtual_setting is None:
+            self.virtual = len(self.rows) > self.VIRTUAL_THRESHOLD
+        else:
+            self.virtual = self.virtual_setting
+        if self.sort_column is not None:
+            self._sort_buffer()
+        if top_key is not None:
+            try:
+                self.offset = self.keys.index(top_key)  # Keep the same row at the top
+            except ValueError:
+                pass
+        self.selected_keys &= set(self.keys)
+        self.focus_index = None
+        self._refresh()
+
+    def sort_by(self, column):
+        """Sort the buffer by a column; sorting the same column again reverses the order
+
+        Args:
+            column: Index of the column to sort by
+        """
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        for index, header in enumerate(self.headers):
+            arrow = ""
+            if index == column:
+                arrow = " \u25bc" if self.sort_reverse else " \u25b2"
+            self.heading(header, text=header + arrow)
+        self._sort_buffer()
+        self.focus_index = None
+        self._refresh()
+
+    def selected_rows(self):
+        """Return the buffer rows that are selected, in display order
+
+        Returns:
+            list: Selected rows, including those scrolled out of the window
+        """
+        return [row for key, row in zip(self.keys, self.rows) if key in self.selected_keys]
+
+    def remove_row(self, key):
+        """Remove a row from the buffer and the display
+
+        Args:
+            key: Item id of the row (its order number)
+        """
+        key = str(key)
+        if key not in self.keys:
+            return
+        index = self.keys.index(key)
+        del self.keys[index]
+        del self.rows[index]
+        self.selected_keys.discard(key)
+        self.focus_index = None
+        self._refresh()
+
+    @staticmethod
+    def _row_keys(rows):
+        """Return the item id of each row: its first value, made unique if repeated"""
+        keys = []
+        seen = set()
+        for row in rows:
+            key = str(row[0]) if len(row) else ""
+            if key in seen:
+                suffix = 2
+                while f"{key}#{suffix}" in seen:
+                    suffix += 1
+                key = f"{key}#{suffix}"
+            seen.add(key)
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    def _format_row(row):
+        """Convert the values of a row to the text shown in the cells"""
+        row_values = []
+        for value in row:
+            if value is None:
+                row_values.append("N/A")  # Replace None with "N/A"
+            else:
+                row_values.append(str(value))  # Convert other values to string
+        return row_values
+
+    def _sort_buffer(self):
+        """Reorder the rows and their keys by the sort column; missing values go last"""
+        column = self.sort_column
+
+        def sort_key(index):
+            row = self.rows[index]
+            value = row[column] if column < len(row) else None
+            return (value is None, value)
+
+        indexes = range(len(self.rows))
+        try:
+            order = sorted(indexes, key=sort_key, reverse=self.sort_reverse)
+        except TypeError:  # Mixed value types in the column, compare their text
+            order = sorted(indexes, key=lambda i: str(self.rows[i][column]), reverse=self.sort_reverse)
+        self.rows = [self.rows[i] for i in order]
+        self.keys = [self.keys[i] for i in order]
+
+    def _refresh(self):
+        """Materialize the buffer again after it changed"""
+        if self.virtual:
+            self.offset = max(0, min(self.offset, len(self.rows) - self._visible_rows()))
+            self._show_window(force=True)
+        else:
+            self._fill(0, len(self.rows))
+            self.offset = 0
+
+    def _fill(self, start, end):
+        """Make the Tk items show the buffer rows start..end and restore their selection
+
+        The items are diffed against the rows by item id: items of rows that
+        are gone are deleted, new rows inserted, changed rows updated and rows
+        out of place moved; everything else is left alone.
+        """
+        wanted = self.keys[start:end]
+        wanted_set = set(wanted)
+        stale = [key for key in self.get_children() if key not in wanted_set]
+        if stale:
+            self.delete(*stale)
+            for key in stale:
+                del self.shown[key]
+
+        # Remaining items, in their current order; walk them alongside the wanted rows
+        current = list(self.get_children())
+        moved = set()
+        position = 0
+        for index, key in enumerate(wanted):
+            while position < len(current) and current[position] in moved:
+                position += 1
+            row = self.rows[start + index]
+            if key not in self.shown:
+                self.insert("", index, iid=key, values=self._format_row(row))
+                self.shown[key] = row
+                continue
+            if position < len(current) and current[position] == key:
+                position += 1
+            else:
+                self.move(key, "", index)
+                moved.add(key)
+            if self.shown[key] != row:
+                self.item(key, values=self._format_row(row))
+                self.shown[key] = row
+        self.window = (start, end)
+        visible_selection = [key for key in self.keys[start:end] if key in self.selected_keys]
+        self.selection_set(visible_selection)
+
+    def _visible_rows(self):
+        """Return how many rows fit in the widget"""
+        row_height = self.DEFAULT_ROW_HEIGHT
+        try:
+            row_height = int(ttk.Style(self).lookup("Treeview", "rowheight") or row_height)
+        except (tk.TclError, ValueError):
+            pass
+        height = self.winfo_height()
+        if height <= 1:  # Not mapped yet, use the requested height in rows
+            return int(self["height"] or 10)
+        return max(1, height // row_height)
+
+    def _show_window(self, force=False):
+        """Show the rows from self.offset, refilling the Tk items if they leave the window
+
+        Args:
+            force: Refill even if the visible rows are already materialized
+        """
+        total = len(self.rows)
+        visible = self._visible_rows()
+        start, end = self.window
+        if force or self.offset < start or self.offset + visible > end and end < total:
+            start = max(0, self.offset - self.VIRTUAL_MARGIN)
+            end = min(total, self.offset + visible + self.VIRTUAL_MARGIN)
+            self._fill(start, end)
+        if end > start:
+            self.yview_moveto((self.offset - start) / (end - start))
+        if total:
+            self.scroll_y.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+        else:
+            self.scroll_y.set(0.0, 1.0)
+
+    def _scroll_to(self, offset):
+        """Move the first visible row to a buffer index, clamped to the list"""
+        limit = max(0, len(self.rows) - self._visible_rows())
+        offset = max(0, min(int(offset), limit))
+        if offset != self.offset:
+            self.offset = offset
+            self._show_window()
+
+    def _on_scrollbar(self, *args):
+        """Scrollbar command: scroll the buffer when virtualized, else the Treeview itself"""
+        if not self.virtual:
+            self.yview(*args)
+            return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._visible_rows()
+            self._scroll_to(self.offset + amount)
+
+    def _on_yscroll(self, first, last):
+        """yscrollcommand of the Treeview; in virtual mode the scrollbar tracks the buffer instead"""
+        if not self.virtual:
+            self.scroll_y.set(first, last)
+
+    def _on_wheel(self, event):
+        """Scroll the buffer with the mouse wheel in virtual mode"""
+        if not self.virtual:
+            return None
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            direction = -1
+        else:
+            direction = 1
+        self._scroll_to(self.offset + direction * self.WHEEL_ROWS)
+        return "break"
+
+    def _on_key(self, step):
+        """Move the keyboard focus through the buffer in virtual mode
+
+        Args:
+            step: Number of rows to move, or 'page-up', 'page-down', 'home', 'end'
+        """
+        if not self.virtual or not self.rows:
+            return None
+        if self.focus_index is None:
+            focused = self.focus()
+            self.focus_index = self.keys.index(focused) if focused in self.keys else self.offset
+            if step in (1, -1) and not focused:
+                step = 0
+        visible = self._visible_rows()
+        if step == "page-up":
+            index = self.focus_index - visible
+        elif step == "page-down":
+            index = self.focus_index + visible
+        elif step == "home":
+            index = 0
+        elif step == "end":
+            index = len(self.rows) - 1
+        else:
+            index = self.focus_index + step
+        index = max(0, min(index, len(self.rows) - 1))
+        self.focus_index = index
+
+        # Bring the row into view, then select it like the Treeview would
+        if index < self.offset:
+            self._scroll_to(index)
+        elif index >= self.offset + visible:
+            self._scroll_to(index - visible + 1)
+        self.selected_keys = {self.keys[index]}
+        self.selection_set(self.keys[index])
+        self.focus(self.keys[index])
+        return "break"
+
+    def _on_select(self, event):
+        """Record the selection in the buffer; rows outside the window keep their state"""
+        start, end = self.window
+        shown = set(self.keys[start:end])
+        self.selected_keys = (self.selected_keys - shown) | set(self.selection())
+
+    def _on_configure(self, event):
+        """Refill the window when the widget is resized"""
+        if self.virtual:
+            self._scroll_to(self.offset)
+            self._show_window()
 
     def _on_motion(self, event):
         """Handle mouse motion events to show tooltips.
@@ -157,7 +453,7 @@ class AutoTreeview(ttk.Treeview):
             success = self.controller.staff_fulfill_order(order_id)
 
             if success:
-                self.delete(item_id)  # Remove the item from the Treeview
+                self.remove_row(item_id)  # Remove the order from the buffer and the Treeview
                 messagebox.showinfo("Success", "Order fulfilled successfully!")  # Show success message
 
 
@@ -253,6 +549,11 @@ class SalesReportFrame(ttk.Frame):
         self.start_date = DateSelector(date_frame, "Start Date:")
         self.start_date.pack(side=tk.LEFT)
         
+        # Open-ended start: report from the first order on record
+        self.from_first_order = tk.BooleanVar(value=False)
+        ttk.Checkbutton(date_frame, text="From first order",
+                        variable=self.from_first_order).pack(side=tk.LEFT, padx=5)
+        
         # End date selector
         self.end_date = DateSelector(date_frame, "End Date:")
         self.end_date.pack(side=tk.LEFT)
@@ -264,15 +565,15 @@ class SalesReportFrame(ttk.Frame):
                   command=self._on_submit).pack(side=tk.LEFT)
     
     def _on_submit(self):
-        start_date = self.start_date.get_date()
+        start_date = None if self.from_first_order.get() else self.start_date.get_date()
         end_date = self.end_date.get_date()
         
-        if not start_date or not end_date:
+        if not (start_date or self.from_first_order.get()) or not end_date:
             messagebox.showerror("Error", "Please select valid dates!")
             return
         
         # Validate dates
-        if start_date > end_date:
+        if start_date and start_date > end_date:
             messagebox.showerror("Error", "Start date cannot be after end date!")
             return
         
@@ -283,6 +584,9 @@ class SalesReportFrame(ttk.Frame):
         self.on_date_submit(start_date, end_date)
 
 class StaffHome:
+    # Number of orders rendered per sales report page
+    REPORT_PAGE_SIZE = 50
+
     def __init__(self, root, staff, controller):
         """Initialize Staff Home window"""
         self.controller = controller
@@ -293,11 +597,19 @@ class StaffHome:
         self.current_frame = None
         self.text_widget = None
         self.current_treeview = None
+        self.current_treeview_title = None
         
         # Add sales report related attributes
         self.report_frame = None
         self.report_text = None
         self.date_selection = None
+        # Paged sales report: selected date range and current page
+        self.report_range = None
+        self.report_page = 0
+        self.report_page_label = None
+
+        # Order lists, reports and customer lists are fetched off the Tk thread
+        self.loader = BackgroundLoader(self.root)
         
         self.setup_window()
         self.create_widgets()
@@ -339,14 +651,27 @@ class StaffHome:
         self.buttons_frame = ttk.Frame(self.function_frame)
         self.buttons_frame.pack(fill=tk.X)
 
-        # Function buttons configuration
+        # Function buttons configuration; data is loaded in the background
         self.function_buttons = {
-            "All Products": lambda: self.show_text_content("All Products", self.controller.staff_all_products()),
-            "Current Orders": lambda: self.show_treeview_content("Current Orders", self.get_current_orders_data(), True),
-            "Previous Orders": lambda: self.show_treeview_content("Previous Orders", self.get_previous_orders_data(), False),
-            "All Customers": lambda: self.show_text_content("All Customers", self.controller.staff_all_customers()),
+            "All Products": lambda: self.load_content(
+                "All Products", self.controller.staff_all_products,
+                lambda content: self.show_text_content("All Products", content)),
+            "Current Orders": lambda: self.load_content(
+                "Current Orders", self.get_current_orders_data,
+                lambda data: self.show_treeview_content("Current Orders", data, True)),
+            "Previous Orders": lambda: self.load_content(
+                "Previous Orders", self.get_previous_orders_data,
+                lambda data: self.show_treeview_content("Previous Orders", data, False)),
+            "All Customers": lambda: self.load_content(
+                "All Customers", self.controller.staff_all_customers,
+                lambda content: self.show_text_content("All Customers", content)),
             "Sales Report": lambda: self.staff_sales_reports(),
-            "Popular Items": lambda: self.show_text_content("Popular Items", self.controller.staff_popular_items())
+            "Popular Items": lambda: self.load_content(
+                "Popular Items", self.controller.staff_popular_items,
+                lambda content: self.show_text_content("Popular Items", content)),
+            "Top 10 This Week": lambda: self.load_content(
+                "Top 10 This Week", lambda: self.controller.staff_top_products(10, 7),
+                lambda content: self.show_text_content("Top 10 This Week", content))
         }
 
         for text, command in self.function_buttons.items():
@@ -373,6 +698,24 @@ class StaffHome:
         # Show welcome message
         self.show_text_content("Welcome", f"Welcome, {self.staff.first_name}!")
 
+    def load_content(self, title, fetch, show):
+        """Show "Loading..." and fetch data on a worker thread, then display it
+
+        Navigating again before the data arrives cancels this load. A list
+        that is already on screen stays there while it is refreshed.
+
+        Args:
+            title (str): Title of the content being loaded
+            fetch: Function returning the data; runs off the Tk thread
+            show: Function displaying the data on the Tk thread
+        """
+        if not self._is_showing_treeview(title):
+            self.show_text_content(title, "Loading...")
+        self.loader.run(
+            fetch, show,
+            lambda e: messagebox.showerror("Error", f"Error loading {title.lower()}: {str(e)}")
+        )
+
     def get_current_orders_data(self):
         """Get current orders data"""
         headers = ["Order ID", "Customer", "Date", "Status", "Items", "Subtotal", "Delivery Fee", "Total Amount"]
@@ -436,9 +779,19 @@ class StaffHome:
         except Exception as e:
             messagebox.showerror("Error", f"Error displaying content: {str(e)}")
 
+    def _is_showing_treeview(self, title):
+        """Return True if the order list with this title is the one on screen"""
+        return (self.current_treeview is not None and self.current_treeview_title == title
+                and bool(self.current_treeview.winfo_manager()))
+
     def show_treeview_content(self, title, data, editable=False):
-        """Display content in treeview"""
+        """Display content in treeview; a list already on screen is updated in place"""
         try:
+            headers, rows = data
+            if self._is_showing_treeview(title):
+                self.current_treeview.update_data(rows)  # Only the changed orders are touched
+                return
+
             for widget in self.display_frame.winfo_children():
                 widget.pack_forget()
             
@@ -462,9 +815,9 @@ class StaffHome:
                     foreground='red'
                 ).pack(side=tk.LEFT, padx=(10, 0))
             
-            headers, rows = data
             mode = "editable" if editable else "readonly"
             self.current_treeview = AutoTreeview(self.display_frame, headers, rows, self.controller, mode=mode)
+            self.current_treeview_title = title
 
         except Exception as e:
             messagebox.showerror("Error", f"Error displaying content: {str(e)}")
@@ -472,6 +825,9 @@ class StaffHome:
     def staff_sales_reports(self):
         """Display sales report with date selection"""
         try:
+            # Stop any list still loading for the previous screen
+            self.loader.cancel()
+
             # Clear existing content
             for widget in self.display_frame.winfo_children():
                 widget.pack_forget()
@@ -518,8 +874,22 @@ class StaffHome:
                 
                 v_scrollbar.config(command=self.report_text.yview)
                 h_scrollbar.config(command=self.report_text.xview)
+                
+                # Page navigation, only the visible page is rendered
+                nav_frame = ttk.Frame(self.report_frame)
+                nav_frame.pack(fill=tk.X, pady=(5, 0))
+                self.report_prev_button = ttk.Button(nav_frame, text="< Previous",
+                                                     command=lambda: self.show_report_page(self.report_page - 1))
+                self.report_prev_button.pack(side=tk.LEFT, padx=5)
+                self.report_next_button = ttk.Button(nav_frame, text="Next >",
+                                                     command=lambda: self.show_report_page(self.report_page + 1))
+                self.report_next_button.pack(side=tk.RIGHT, padx=5)
+                self.report_page_label = ttk.Label(nav_frame, text="")
+                self.report_page_label.pack(side=tk.TOP)
             
             self.report_frame.pack(fill=tk.BOTH, expand=True)
+            self.report_range = None
+            self._update_report_navigation(0, 0)
             
             # Set/Reset initial text
             self.report_text.config(state='normal')
@@ -531,29 +901,62 @@ class StaffHome:
             messagebox.showerror("Error", f"Error displaying sales report: {str(e)}")
 
     def update_sales_report(self, start_date, end_date):
-        """Update sales report with new date range"""
+        """Update sales report with new date range, starting at the first page"""
+        self.report_range = (start_date, end_date)
+        self.show_report_page(0)
+
+    def show_report_page(self, page):
+        """Load one page of the sales report for the selected date range in the background"""
         try:
-            if self.report_text:  # Only update if text widget exists
-                # Get report content from controller
-                report_content = self.controller.staff_sales_report(start_date, end_date)
-                
-                # Update text widget with new content
+            if self.report_text and self.report_range:  # Only update if text widget exists
+                # Show progress and disable navigation until the page arrives
                 self.report_text.config(state='normal')
                 self.report_text.delete(1.0, tk.END)
-                self.report_text.insert(tk.END, report_content)
+                self.report_text.insert(tk.END, "Loading...")
                 self.report_text.config(state='disabled')
+                self._update_report_navigation(page, 0)
+
+                # Get the page content from controller on a worker thread
+                start_date, end_date = self.report_range
+                self.loader.run(
+                    lambda: self.controller.staff_sales_report_page(
+                        start_date, end_date, page, self.REPORT_PAGE_SIZE),
+                    self._render_report_page,
+                    lambda e: messagebox.showerror("Error", f"Error updating sales report: {str(e)}")
+                )
 
         except Exception as e:
             messagebox.showerror("Error", f"Error updating sales report: {str(e)}")
 
+    def _render_report_page(self, report_page):
+        """Put a loaded report page into the text widget"""
+        self.report_page = report_page["page"]
+        
+        # Update text widget with the page content
+        self.report_text.config(state='normal')
+        self.report_text.delete(1.0, tk.END)
+        self.report_text.insert(tk.END, '\n'.join([report_page["header"]] + report_page["orders"]))
+        self.report_text.config(state='disabled')
+        self._update_report_navigation(self.report_page, report_page["page_count"])
+
+    def _update_report_navigation(self, page, page_count):
+        """Update the page label and enable the navigation buttons that apply"""
+        if not self.report_page_label:
+            return
+        self.report_page_label.config(text=f"Page {page + 1} of {page_count}" if page_count else "")
+        self.report_prev_button.config(state='normal' if page > 0 else 'disabled')
+        self.report_next_button.config(state='normal' if page + 1 < page_count else 'disabled')
+
     def on_logout(self):
         """Handle logout action"""
         if messagebox.askyesno("Logout Confirmation", "Are you sure you want to logout?"):
+            self.loader.close()
             self.root.destroy()
             self.login_window.deiconify()
 
     def on_closing(self):
         """Handle window close event"""
         if messagebox.askyesno("Quit Confirmation", "Are you sure you want to quit the application?"):
+            self.loader.close()
             self.root.destroy()
             self.login_window.destroy()
\ No newline at end of file